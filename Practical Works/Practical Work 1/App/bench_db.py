@@ -0,0 +1,119 @@
+import csv
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from proposals_db import ProposalDB, CREATE_PROPOSAL, INSERT_PROPOSAL, SELECT_ALL
+from proposals_import import import_proposals
+
+
+ROW = ('Отдел', 'Предложение', 'Средний', '2026-03-01', 1000.0)
+
+
+def old_add(path):
+    conn = sqlite3.connect(path)
+    conn.execute(INSERT_PROPOSAL, ROW)
+    conn.commit()
+    conn.close()
+
+
+def old_get(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute(SELECT_ALL).fetchall()
+    conn.close()
+    return rows
+
+
+def measure(fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - start)
+
+
+def bench_report(path, rows):
+    db = ProposalDB(path)
+    db.init_schema()
+    departments = [f'Отдел {i}' for i in range(50)]
+    priorities = ['Высокий', 'Средний', 'Низкий']
+    with db.writer() as conn:
+        conn.executemany(INSERT_PROPOSAL, (
+            (departments[i % 50], f'Предложение {i}', priorities[i % 3],
+             f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}', float(i % 100000)) for i in range(rows)
+        ))
+    db.conn.execute('ANALYZE')
+    start = time.perf_counter()
+    db.get_report(top_n=10)
+    elapsed = (time.perf_counter() - start) * 1000
+    db.close()
+    return elapsed
+
+
+def bench_import(tmp, rows):
+    csv_path = os.path.join(tmp, 'import.csv')
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['department', 'proposal_text', 'priority', 'deadline', 'cost'])
+        writer.writerows((f'Отдел {i % 50}', f'Предложение {i}', ('Высокий', 'Средний', 'Низкий')[i % 3],
+                          f'2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}', i % 100000) for i in range(rows))
+    db = ProposalDB(os.path.join(tmp, 'import.db'))
+    db.init_schema()
+    start = time.perf_counter()
+    result = import_proposals(db, csv_path)
+    elapsed = time.perf_counter() - start
+    db.close()
+    return result['imported'] / elapsed
+
+
+def bench_search(path, rows, queries=200):
+    rng = random.Random(1)
+    words = [''.join(rng.choice('абвгдеиклмнопрстуя') for _ in range(rng.randint(4, 9))) for _ in range(5000)]
+    db = ProposalDB(path)
+    db.init_schema()
+    with db.writer() as conn:
+        conn.executemany(INSERT_PROPOSAL, (
+            (f'Отдел {i % 50}', ' '.join(rng.choices(words, k=6)), 'Средний', '2026-01-01', 1.0) for i in range(rows)
+        ))
+    typed = []
+    for word in rng.choices(words, k=queries):
+        typed += [word[:n] for n in range(2, len(word) + 1)]
+    start = time.perf_counter()
+    for text in typed:
+        db.search_proposals(text)
+    elapsed = (time.perf_counter() - start) * 1000 / len(typed)
+    db.close()
+    return elapsed
+
+
+def main(inserts=2000, reads=500, report_rows=1000000, search_rows=500000):
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, 'old.db')
+        conn = sqlite3.connect(old_path)
+        conn.execute(CREATE_PROPOSAL)
+        conn.close()
+        old_ins = measure(lambda: old_add(old_path), inserts)
+        old_read = measure(lambda: old_get(old_path), reads)
+
+        db = ProposalDB(os.path.join(tmp, 'new.db'))
+        db.init_schema()
+        new_ins = measure(lambda: db.add_proposal(*ROW), inserts)
+        new_read = measure(db.get_proposals, reads)
+        db.close()
+
+        report_ms = bench_report(os.path.join(tmp, 'report.db'), report_rows)
+        import_rate = bench_import(tmp, report_rows)
+        search_ms = bench_search(os.path.join(tmp, 'search.db'), search_rows)
+
+    print(f'{"":<22}{"до":>12}{"после":>12}{"x":>8}')
+    print(f'{"вставок/с":<22}{old_ins:>12.0f}{new_ins:>12.0f}{new_ins / old_ins:>8.1f}')
+    print(f'{"чтений таблицы/с":<22}{old_read:>12.0f}{new_read:>12.0f}{new_read / old_read:>8.1f}')
+    print(f'отчёт по {report_rows} строкам: {report_ms:.0f} мс')
+    print(f'импорт CSV ({report_rows} строк): {import_rate:.0f} строк/с')
+    print(f'поиск по {search_rows} строкам: {search_ms:.1f} мс на запрос')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from proposals_db import ProposalDB, CREATE_PROPOSAL, INSERT_PROPOSAL
+
+
+ROW = ('Отдел', 'Предложение', 'Средний', '2026-03-01', 1000.0)
+
+
+def old_add(path):
+    # Прежний путь записи: новое соединение, отложенный BEGIN, коммит на вставку.
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(INSERT_PROPOSAL, ROW)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run_writer(add, count, latencies, errors):
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            add()
+        except sqlite3.OperationalError:
+            errors.append(1)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def run_threads(add, writers, count):
+    latencies, errors = [], []
+    threads = [threading.Thread(target=run_writer, args=(add, count, latencies, errors)) for _ in range(writers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, latencies, len(errors)
+
+
+def process_writer(path, writers, count, mode, results):
+    if mode == 'old':
+        elapsed, latencies, errors = run_threads(lambda: old_add(path), writers, count)
+    else:
+        db = ProposalDB(path)
+        elapsed, latencies, errors = run_threads(lambda: db.add_proposal(*ROW), writers, count)
+        db.close()
+    results.put((latencies, errors))
+
+
+def run_processes(path, mode, processes, writers, count):
+    # Каждый процесс - отдельный "оператор" со своими потоками-писателями.
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=process_writer, args=(path, writers, count, mode, results))
+             for _ in range(processes)]
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    latencies, errors = [], 0
+    for _ in procs:
+        lat, err = results.get()
+        latencies += lat
+        errors += err
+    for p in procs:
+        p.join()
+    return time.perf_counter() - start, latencies, errors
+
+
+def report(name, elapsed, latencies, errors):
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0
+    print(f'{name:<28}{len(latencies) / elapsed:>12.0f}{p50:>10.2f}{p99:>10.2f}{errors:>10}')
+
+
+def main(processes=4, writers=8, count=250):
+    print(f'{processes} процесса x {writers} потоков x {count} вставок')
+    print(f'{"":<28}{"вставок/с":>12}{"p50, мс":>10}{"p99, мс":>10}{"ошибок":>10}')
+    with tempfile.TemporaryDirectory() as tmp:
+        old_path = os.path.join(tmp, 'old.db')
+        conn = sqlite3.connect(old_path)
+        conn.execute(CREATE_PROPOSAL)
+        conn.close()
+        report('до (соединение на вызов)', *run_processes(old_path, 'old', processes, writers, count))
+
+        new_path = os.path.join(tmp, 'new.db')
+        db = ProposalDB(new_path)
+        db.init_schema()
+        db.close()
+        report('после (поток записи)', *run_processes(new_path, 'new', processes, writers, count))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
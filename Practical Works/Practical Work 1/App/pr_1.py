@@ -1,45 +1,23 @@
 import flet as ft
-import sqlite3
-from datetime import datetime
-
-
-def init_db():
-    conn = sqlite3.connect('proposals.db')
-    cursor = conn.cursor()
-    cursor.execute('''CREATE TABLE IF NOT EXISTS proposal
-                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                      department TEXT,
-                      proposal_text TEXT,
-                      priority TEXT,
-                      deadline TEXT,
-                      cost REAL)''')
-    cursor.execute('SELECT COUNT(*) FROM proposal')
-    if cursor.fetchone()[0] == 0:
-        data = [
-            ('Пивной отдел Пятрерочка', 'Купить пиво', 'Высокий', '2026-03-01', 150000),
-        ]
-        cursor.executemany('INSERT INTO proposal (department, proposal_text, priority, deadline, cost) VALUES (?, ?, ?, ?, ?)', data)
-    conn.commit()
-    conn.close()
-
-
-def get_proposals():
-    conn = sqlite3.connect('proposals.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM proposal')
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
-
-
-def add_proposal(department, proposal_text, priority, deadline, cost):
-    conn = sqlite3.connect('proposals.db')
-    cursor = conn.cursor()
-    print(department, proposal_text, priority, deadline, cost)
-    print(cursor.execute('INSERT INTO proposal (department, proposal_text, priority, deadline, cost) VALUES (?, ?, ?, ?, ?)',
-                  (department, proposal_text, priority, deadline, float(cost))))
-    conn.commit()
-    conn.close()
+import atexit
+import os
+import threading
+from datetime import datetime, date
+from proposals_db import ProposalDB
+from proposals_import import import_proposals
+from proposals_export import export_report, ExportCancelled
+
+
+PAGE_SIZE = 50
+SORT_KEYS = ['department', 'proposal_text', 'priority', 'deadline', 'cost']
+
+
+def parses(convert, value):
+    try:
+        convert(value)
+        return True
+    except ValueError:
+        return False
 
 
 def main(page: ft.Page):
@@ -47,107 +25,432 @@ def main(page: ft.Page):
     page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
     page.vertical_alignment = ft.MainAxisAlignment.CENTER
 
-    init_db()
+    db = ProposalDB()
+    db.init_schema()
+    atexit.register(db.close)
+
+    def on_sort(e):
+        view['sort'] = SORT_KEYS[e.column_index]
+        view['descending'] = not e.ascending
+        table.sort_column_index = e.column_index
+        table.sort_ascending = e.ascending
+        go_to_page(1)
 
     table = ft.DataTable(columns=[
-        ft.DataColumn(ft.Text('Подразделение')),
-        ft.DataColumn(ft.Text('Предложение')),
-        ft.DataColumn(ft.Text('Приоритет')),
-        ft.DataColumn(ft.Text('Срок')),
-        ft.DataColumn(ft.Text('Стоимость'))
+        ft.DataColumn(ft.Text('Подразделение'), on_sort=on_sort),
+        ft.DataColumn(ft.Text('Предложение'), on_sort=on_sort),
+        ft.DataColumn(ft.Text('Приоритет'), on_sort=on_sort),
+        ft.DataColumn(ft.Text('Срок'), on_sort=on_sort),
+        ft.DataColumn(ft.Text('Стоимость'), numeric=True, on_sort=on_sort),
+        ft.DataColumn(ft.Text(''))
     ], rows=[])
 
+    view = {'sort': 'id', 'descending': False, 'priorities': [], 'deadline_from': None, 'deadline_to': None}
+    pager = {'page': 1, 'first_key': None, 'last_key': None, 'has_next': False, 'total': 0, 'total_filters': None,
+             'searching': False}
+    page_info = ft.Text('')
+    page_size_input = ft.Dropdown(label='Строк на странице', value=str(PAGE_SIZE), width=170, options=[
+        ft.DropdownOption(key=str(n), text=str(n)) for n in (25, 50, 100, 200)
+    ], on_change=lambda e: go_to_page(1))
+    page_input = ft.TextField(label='Страница', width=110)
+    search_input = ft.TextField(label='Поиск', prefix_icon=ft.Icons.SEARCH, width=400,
+                                on_change=lambda e: search(e.control.value))
+
+    def toggle_priority(e):
+        view['priorities'] = [chip.data for chip in priority_chips if chip.selected]
+        go_to_page(1)
+
+    def apply_deadline(e):
+        for field, key in ((deadline_from_input, 'deadline_from'), (deadline_to_input, 'deadline_to')):
+            value = (field.value or '').strip()
+            try:
+                view[key] = date.fromisoformat(value).isoformat() if value else None
+                field.error_text = None
+            except ValueError:
+                field.error_text = 'YYYY-MM-DD'
+        go_to_page(1)
+
+    priority_chips = [ft.Chip(label=ft.Text(name), data=name, on_select=toggle_priority)
+                      for name in ('Высокий', 'Средний', 'Низкий')]
+    deadline_from_input = ft.TextField(label='Срок с', width=140, on_submit=apply_deadline, on_blur=apply_deadline)
+    deadline_to_input = ft.TextField(label='Срок по', width=140, on_submit=apply_deadline, on_blur=apply_deadline)
+
+    def page_size():
+        return int(page_size_input.value or PAGE_SIZE)
+
+    def row_key(p):
+        return p[6], p[0]
+
+    def is_default_view():
+        return view['sort'] == 'id' and not view['descending'] and not (
+            view['priorities'] or view['deadline_from'] or view['deadline_to'])
+
+    def view_filters():
+        return tuple(view['priorities']), view['deadline_from'], view['deadline_to']
+
+    def count_rows(recount=False):
+        # Число строк зависит только от фильтров, поэтому запоминается для них:
+        # листание и сортировка его не пересчитывают, добавление и удаление
+        # правят на ±1, а загрузка, «Обновить» и импорт считают заново.
+        if recount or pager['total_filters'] != view_filters():
+            pager['total'] = db.count_proposals(view)
+            pager['total_filters'] = view_filters()
+        return pager['total']
+
+    def make_report_row(p):
+        return ft.DataRow(cells=[
+            ft.DataCell(ft.Text(p[1])),
+            ft.DataCell(ft.Text(p[2])),
+            ft.DataCell(ft.Text(p[3])),
+            ft.DataCell(ft.Text(p[4])),
+            ft.DataCell(ft.Text(f'{p[5] or 0:.0f} ₽'))
+        ])
+
+    def make_row(p):
+        row = make_report_row(p)
+        row.data = p
+        row.cells.append(ft.DataCell(ft.Row([
+            ft.IconButton(ft.Icons.EDIT, on_click=lambda e: open_proposal_dialog(row)),
+            ft.IconButton(ft.Icons.DELETE, on_click=lambda e: delete_row(row))
+        ], tight=True)))
+        return row
+
+    def update_page_info():
+        total_pages = max(1, -(-pager['total'] // page_size()))
+        page_info.value = f'Страница {pager["page"]} из {total_pages}'
+
+    def append_row(p):
+        # Новая запись имеет максимальный id, поэтому в представлении по умолчанию
+        # видна только на последней странице; на остальных достаточно обновить
+        # счётчик страниц. При сортировке и фильтрах место записи знает только
+        # запрос, поэтому она появится после обновления таблицы.
+        if pager['searching'] or not is_default_view():
+            pager['total_filters'] = None
+            return
+        pager['total'] += 1
+        p = p + (p[0],)
+        if not pager['has_next'] and len(table.rows) < page_size():
+            table.rows.append(make_row(p))
+            if len(table.rows) == 1:
+                pager['first_key'] = row_key(p)
+            pager['last_key'] = row_key(p)
+        elif not pager['has_next']:
+            pager['has_next'] = True
+        update_page_info()
+        page.update()
+
+    def replace_row(row, p):
+        if p and row in table.rows:
+            # Сохраняем прежнее значение ключа сортировки, чтобы границы
+            # страницы для листания оставались согласованными.
+            table.rows[table.rows.index(row)] = make_row(p + row.data[6:])
+            if any(view_filters()):
+                pager['total_filters'] = None
+            page.update()
+
+    def delete_row(row):
+        if db.delete_proposal(row.data[0]):
+            refresh_summary()
+            if pager['searching']:
+                pager['total_filters'] = None
+            else:
+                pager['total'] -= 1
+            table.rows.remove(row)
+            if not pager['searching']:
+                if table.rows:
+                    pager['first_key'], pager['last_key'] = row_key(table.rows[0].data), row_key(table.rows[-1].data)
+                update_page_info()
+            page.update()
+
+    def show_rows(rows, number):
+        # Берём на одну строку больше, чтобы узнать, есть ли следующая страница.
+        size = page_size()
+        pager['has_next'] = len(rows) > size
+        rows = rows[:size]
+        if rows:
+            pager['first_key'], pager['last_key'] = row_key(rows[0]), row_key(rows[-1])
+        pager['page'] = number
+        pager['searching'] = False
+        search_input.value = ''
+        count_rows()
+        update_page_info()
+        table.rows = [make_row(p) for p in rows]
+        page.update()
+
     def load_table():
-        table.rows = []
-        for p in get_proposals():
-            cost_val = float(p[5]) if p[5] else 0
-            table.rows.append(ft.DataRow(cells=[
-                ft.DataCell(ft.Text(p[1])),
-                ft.DataCell(ft.Text(p[2])),
-                ft.DataCell(ft.Text(p[3])),
-                ft.DataCell(ft.Text(p[4])),
-                ft.DataCell(ft.Text(f'{cost_val:.0f} ₽'))
-            ]))
+        refresh_summary()
+        count_rows(recount=True)
+        go_to_page(pager['page'])
+
+    summary_total = ft.Text('', weight=ft.FontWeight.BOLD)
+    summary_table = ft.DataTable(columns=[
+        ft.DataColumn(ft.Text('Подразделение')),
+        ft.DataColumn(ft.Text('Кол-во'), numeric=True),
+        ft.DataColumn(ft.Text('Сумма'), numeric=True),
+        ft.DataColumn(ft.Text('Высокий'), numeric=True),
+        ft.DataColumn(ft.Text('Средний'), numeric=True),
+        ft.DataColumn(ft.Text('Низкий'), numeric=True)
+    ], rows=[])
+
+    def refresh_summary():
+        summary = db.get_summary()
+        summary_table.rows = [ft.DataRow(cells=[
+            ft.DataCell(ft.Text(d)),
+            ft.DataCell(ft.Text(str(count))),
+            ft.DataCell(ft.Text(f'{total:.0f} ₽')),
+            ft.DataCell(ft.Text(f'{high:.0f} ₽')),
+            ft.DataCell(ft.Text(f'{medium:.0f} ₽')),
+            ft.DataCell(ft.Text(f'{low:.0f} ₽'))
+        ]) for d, count, total, _, high, _, medium, _, low in summary]
+        summary_total.value = (f'Всего: {sum(r[1] for r in summary)} предложений '
+                               f'на {sum(r[2] for r in summary):.0f} ₽')
+
+    def rebuild_summary(e):
+        db.rebuild_summary()
+        refresh_summary()
+        page.update()
+
+    def go_to_page(number):
+        number = max(1, number)
+        rows = db.get_page(view, offset=(number - 1) * page_size(), limit=page_size() + 1)
+        if not rows and number > 1:
+            number = max(1, -(-count_rows() // page_size()))
+            rows = db.get_page(view, offset=(number - 1) * page_size(), limit=page_size() + 1)
+        show_rows(rows, number)
+
+    def search(text):
+        text = (text or '').strip()
+        if not text:
+            load_table()
+            return
+        rows = db.search_proposals(text, page_size())
+        # Обработчики нажатий выполняются в потоках, поэтому ответ на устаревший
+        # запрос может прийти позже свежего - такой ответ отбрасываем.
+        if (search_input.value or '').strip() != text:
+            return
+        pager['searching'] = True
+        pager['has_next'] = False
+        page_info.value = f'Найдено: {len(rows)}' + (' (первые)' if len(rows) == page_size() else '')
+        table.rows = [make_row(p) for p in rows]
         page.update()
 
+    def next_page(e):
+        if pager['has_next'] and not pager['searching']:
+            show_rows(db.get_page(view, after=pager['last_key'], limit=page_size() + 1), pager['page'] + 1)
+
+    def prev_page(e):
+        if pager['page'] > 1 and not pager['searching']:
+            rows = db.get_page(view, before=pager['first_key'], limit=page_size())
+            # Первая строка текущей страницы показывает, что следующая страница есть.
+            show_rows(rows + [r.data for r in table.rows[:1]], pager['page'] - 1)
+
+    def jump_to_page(e):
+        if page_input.value and page_input.value.isdigit():
+            go_to_page(int(page_input.value))
+
     def open_add_dialog(e):
-        dep_input = ft.TextField(label='Подразделение')
-        prop_input = ft.TextField(label='Предложение')
-        prio_input = ft.Dropdown(label='Приоритет', options=[
+        open_proposal_dialog()
+
+    def open_proposal_dialog(row=None):
+        values = row.data[1:] if row else (None,) * 5
+        dep_input = ft.TextField(label='Подразделение', value=values[0])
+        prop_input = ft.TextField(label='Предложение', value=values[1])
+        prio_input = ft.Dropdown(label='Приоритет', value=values[2], options=[
             ft.DropdownOption(key='Высокий', text='Высокий'),
             ft.DropdownOption(key='Средний', text='Средний'),
             ft.DropdownOption(key='Низкий', text='Низкий')
         ])
-        date_input = ft.TextField(label='Срок реализации (YYYY-MM-DD)')
-        cost_input = ft.TextField(label='Стоимость')
+        date_input = ft.TextField(label='Срок реализации (YYYY-MM-DD)', value=values[3])
+        cost_input = ft.TextField(label='Стоимость', value=None if values[4] is None else f'{values[4]:.0f}')
 
         def save(e):
             if dep_input.value and prop_input.value and prio_input.value and date_input.value and cost_input.value:
-                add_proposal(dep_input.value, prop_input.value, prio_input.value, date_input.value, cost_input.value)
-                load_table()
+                date_input.error_text = None if parses(date.fromisoformat, date_input.value.strip()) else 'YYYY-MM-DD'
+                cost_input.error_text = None if parses(float, cost_input.value) else 'Введите число'
+                if date_input.error_text or cost_input.error_text:
+                    page.update()
+                    return
+                fields = (dep_input.value, prop_input.value, prio_input.value, date_input.value, cost_input.value)
                 page.close(dlg)
+                if row:
+                    saved = db.update_proposal(row.data[0], *fields)
+                else:
+                    saved = db.add_proposal(*fields)
+                refresh_summary()
+                if row:
+                    replace_row(row, saved)
+                else:
+                    append_row(saved)
                 page.update()
 
         dlg = ft.AlertDialog(
-            title=ft.Text('Добавить предложение'),
+            title=ft.Text('Изменить предложение' if row else 'Добавить предложение'),
             content=ft.Column([dep_input, prop_input, prio_input, date_input, cost_input], tight=True),
             actions=[ft.Button('Сохранить', on_click=save), ft.Button('Отмена', on_click=lambda e: page.close(dlg))]
         )
         page.open(dlg)
 
+    def group_table(title, groups):
+        return ft.DataTable(columns=[
+            ft.DataColumn(ft.Text(title)),
+            ft.DataColumn(ft.Text('Количество'), numeric=True),
+            ft.DataColumn(ft.Text('Стоимость'), numeric=True)
+        ], rows=[ft.DataRow(cells=[
+            ft.DataCell(ft.Text(name or '—')),
+            ft.DataCell(ft.Text(str(count))),
+            ft.DataCell(ft.Text(f'{cost:.0f} ₽'))
+        ]) for name, count, cost in groups])
+
     def open_report_dialog(e):
-        proposals = get_proposals()
-        total_cost = sum(float(p[5]) if p[5] else 0 for p in proposals)
+        report = db.get_report()
         report_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        report_cols = [
+        top_input = ft.Dropdown(label='Самые дорогие', value='0', width=170, options=[
+            ft.DropdownOption(key=str(n), text=str(n) if n else 'Не показывать') for n in (0, 10, 25, 100)
+        ])
+        top_table = ft.DataTable(columns=[
             ft.DataColumn(ft.Text('Подразделение')),
             ft.DataColumn(ft.Text('Предложение')),
             ft.DataColumn(ft.Text('Приоритет')),
             ft.DataColumn(ft.Text('Срок')),
             ft.DataColumn(ft.Text('Стоимость'))
-        ]
-        report_rows = []
-        for p in proposals:
-            cost_val = float(p[5]) if p[5] else 0
-            report_rows.append(ft.DataRow(cells=[
-                ft.DataCell(ft.Text(p[1])),
-                ft.DataCell(ft.Text(p[2])),
-                ft.DataCell(ft.Text(p[3])),
-                ft.DataCell(ft.Text(p[4])),
-                ft.DataCell(ft.Text(f'{cost_val:.0f} ₽'))
-            ]))
-
-        report_table = ft.DataTable(columns=report_cols, rows=report_rows)
-
-        def print_report(e):
-            print(f'Отчет сформирован: {report_date}, Всего предложений: {len(proposals)}, Общая стоимость: {total_cost}')
+        ], rows=[], visible=False)
+
+        def show_top(e):
+            top_n = int(top_input.value or 0)
+            top_table.rows = [make_report_row(p) for p in db.get_top(top_n)] if top_n else []
+            top_table.visible = bool(top_n)
+            page.update()
+
+        top_input.on_change = show_top
+
+        def save_report(extension):
+            export_job['report'] = report
+            page.close(dlg)
+            save_picker.save_file(file_name=f'report_{datetime.now():%Y%m%d_%H%M%S}.{extension}',
+                                  allowed_extensions=[extension])
 
         dlg = ft.AlertDialog(
             title=ft.Text('Отчет'),
             content=ft.Column([
                 ft.Text(f'Дата формирования: {report_date}'),
-                ft.Text(f'Всего предложений: {len(proposals)}'),
-                ft.Text(f'Общая стоимость: {total_cost:.0f} ₽'),
-                report_table,
-                ft.Button('Распечатать', on_click=print_report)
-            ], tight=True)
+                ft.Text(f'Всего предложений: {report["count"]}'),
+                ft.Text(f'Общая стоимость: {report["total"]:.0f} ₽'),
+                group_table('Подразделение', report['by_department']),
+                group_table('Приоритет', report['by_priority']),
+                group_table('Месяц', report['by_month']),
+                top_input,
+                top_table,
+                ft.Row([
+                    ft.Button('Экспорт CSV', on_click=lambda e: save_report('csv')),
+                    ft.Button('Экспорт PDF', on_click=lambda e: save_report('pdf'))
+                ])
+            ], tight=True, scroll=ft.ScrollMode.AUTO)
         )
         page.open(dlg)
 
+    import_status = ft.Text('')
+    import_progress = ft.ProgressBar(width=400, visible=False)
+
+    def run_import(path):
+        def on_progress(imported, rejected):
+            import_status.value = f'Импортировано: {imported}, отклонено: {rejected}'
+            page.update()
+
+        import_progress.visible = True
+        import_status.value = f'Импорт {path}...'
+        page.update()
+        try:
+            result = import_proposals(db, path, on_progress=on_progress)
+        except Exception as ex:
+            import_status.value = f'Ошибка импорта: {ex}'
+        else:
+            lines = [f'Импортировано: {result["imported"]}, отклонено: {result["rejected"]}']
+            lines += [f'Строка {line}: {reason}' for line, reason in result['errors'][:5]]
+            import_status.value = '\n'.join(lines)
+        import_progress.visible = False
+        load_table()
+
+    def on_file_picked(e):
+        if e.files:
+            page.run_thread(run_import, e.files[0].path)
+
+    file_picker = ft.FilePicker(on_result=on_file_picked)
+    page.overlay.append(file_picker)
+
+    export_job = {'report': None, 'cancel': threading.Event()}
+    export_status = ft.Text('')
+    export_progress = ft.ProgressBar(width=400, value=0, visible=False)
+    export_cancel = ft.Button('Отменить экспорт', visible=False, on_click=lambda e: export_job['cancel'].set())
+
+    def run_export(path):
+        report = export_job['report']
+        total = max(report['count'], 1)
+
+        def on_progress(done):
+            export_progress.value = min(done / total, 1)
+            export_status.value = f'Экспортировано: {done} из {report["count"]}'
+            page.update()
+
+        export_job['cancel'].clear()
+        export_progress.value = 0
+        export_progress.visible = export_cancel.visible = True
+        export_status.value = f'Экспорт в {path}...'
+        page.update()
+        try:
+            done = export_report(db, path, report, on_progress, export_job['cancel'])
+            export_status.value = f'Отчет сохранен: {path} ({done} строк)'
+        except ExportCancelled:
+            export_status.value = 'Экспорт отменен'
+        except Exception as ex:
+            export_status.value = f'Ошибка экспорта: {ex}'
+        export_progress.visible = export_cancel.visible = False
+        page.update()
+
+    def on_save_picked(e):
+        if e.path:
+            path = e.path
+            if not os.path.splitext(path)[1]:
+                path += '.csv'
+            page.run_thread(run_export, path)
+
+    save_picker = ft.FilePicker(on_result=on_save_picked)
+    page.overlay.append(save_picker)
+
     def exit_app(e):
-        pass
+        db.close()
+        page.window.close()
 
     load_table()
 
     page.add(ft.Column([
         ft.Text('Предложения о расширении ИС', size=24, weight=ft.FontWeight.BOLD),
+        summary_total,
+        ft.Column([summary_table], height=200, scroll=ft.ScrollMode.AUTO),
+        search_input,
+        ft.Row([*priority_chips, deadline_from_input, deadline_to_input]),
         table,
+        ft.Row([
+            ft.IconButton(ft.Icons.CHEVRON_LEFT, on_click=prev_page),
+            page_info,
+            ft.IconButton(ft.Icons.CHEVRON_RIGHT, on_click=next_page),
+            page_input,
+            ft.Button('Перейти', on_click=jump_to_page),
+            page_size_input
+        ]),
         ft.Row([
             ft.Button('Добавить предложение', on_click=open_add_dialog),
             ft.Button('Сформировать отчет', on_click=open_report_dialog),
+            ft.Button('Обновить', on_click=lambda e: load_table()),
+            ft.Button('Пересчитать сводку', on_click=rebuild_summary),
+            ft.Button('Импорт CSV/XLSX', on_click=lambda e: file_picker.pick_files(
+                allowed_extensions=['csv', 'xlsx'], allow_multiple=False)),
             ft.Button('Выход', on_click=exit_app)
-        ])
+        ]),
+        import_progress,
+        import_status,
+        ft.Row([export_progress, export_cancel]),
+        export_status
     ]))
 
 
@@ -0,0 +1,476 @@
+import sqlite3
+import threading
+import queue
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+
+DB_PATH = 'proposals.db'
+GROUP_COMMIT_SIZE = 256
+
+PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-16000',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA busy_timeout=5000',
+)
+
+CREATE_PROPOSAL = '''CREATE TABLE IF NOT EXISTS proposal
+                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      department TEXT,
+                      proposal_text TEXT,
+                      priority TEXT,
+                      deadline TEXT,
+                      cost REAL)'''
+
+CREATE_INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_proposal_department ON proposal(department, cost)',
+    'CREATE INDEX IF NOT EXISTS idx_proposal_priority ON proposal(priority, cost)',
+    'CREATE INDEX IF NOT EXISTS idx_proposal_month ON proposal(substr(deadline, 1, 7), cost)',
+    'CREATE INDEX IF NOT EXISTS idx_proposal_cost ON proposal(cost)',
+)
+
+# Сводка по подразделениям: счётчики и суммы в разрезе приоритетов. Её ведут
+# триггеры, поэтому чтение стоит O(числа подразделений), а не O(числа строк).
+SUMMARY_COLUMNS = ('proposal_count', 'total_cost', 'high_count', 'high_cost',
+                   'medium_count', 'medium_cost', 'low_count', 'low_cost')
+CREATE_SUMMARY = '''CREATE TABLE IF NOT EXISTS department_summary
+                    (department TEXT PRIMARY KEY NOT NULL,
+                     proposal_count INTEGER NOT NULL DEFAULT 0,
+                     total_cost REAL NOT NULL DEFAULT 0,
+                     high_count INTEGER NOT NULL DEFAULT 0,
+                     high_cost REAL NOT NULL DEFAULT 0,
+                     medium_count INTEGER NOT NULL DEFAULT 0,
+                     medium_cost REAL NOT NULL DEFAULT 0,
+                     low_count INTEGER NOT NULL DEFAULT 0,
+                     low_cost REAL NOT NULL DEFAULT 0)'''
+
+
+def summary_values(row):
+    cost = f'IFNULL({row}.cost, 0)'
+    values = ['1', cost]
+    for rank in range(3):
+        values += [f'({row}.priority_rank = {rank})', f'IIF({row}.priority_rank = {rank}, {cost}, 0)']
+    return values
+
+
+def summary_add(row):
+    return (f'''INSERT INTO department_summary (department, {', '.join(SUMMARY_COLUMNS)})
+                VALUES (IFNULL({row}.department, ''), {', '.join(summary_values(row))})
+                ON CONFLICT(department) DO UPDATE SET '''
+            + ', '.join(f'{c} = {c} + excluded.{c}' for c in SUMMARY_COLUMNS) + ';')
+
+
+def summary_subtract(row):
+    changes = ', '.join(f'{c} = {c} - {v}' for c, v in zip(SUMMARY_COLUMNS, summary_values(row)))
+    return (f"UPDATE department_summary SET {changes} WHERE department = IFNULL({row}.department, '');"
+            f"DELETE FROM department_summary WHERE department = IFNULL({row}.department, '') AND proposal_count <= 0;")
+
+
+CREATE_SUMMARY_TRIGGERS = (
+    f'CREATE TRIGGER IF NOT EXISTS proposal_summary_insert AFTER INSERT ON proposal BEGIN {summary_add("new")} END',
+    f'CREATE TRIGGER IF NOT EXISTS proposal_summary_delete AFTER DELETE ON proposal BEGIN {summary_subtract("old")} END',
+    f'''CREATE TRIGGER IF NOT EXISTS proposal_summary_update AFTER UPDATE OF department, priority, cost ON proposal
+        BEGIN {summary_subtract("old")} {summary_add("new")} END''',
+)
+SUMMARY_FROM_PROPOSALS = '''SELECT IFNULL(department, ''), COUNT(*), IFNULL(SUM(cost), 0),
+                                   SUM(priority_rank = 0), IFNULL(SUM(IIF(priority_rank = 0, cost, 0)), 0),
+                                   SUM(priority_rank = 1), IFNULL(SUM(IIF(priority_rank = 1, cost, 0)), 0),
+                                   SUM(priority_rank = 2), IFNULL(SUM(IIF(priority_rank = 2, cost, 0)), 0)
+                            FROM proposal GROUP BY 1'''
+REBUILD_SUMMARY = (
+    'DELETE FROM department_summary',
+    f'INSERT INTO department_summary (department, {", ".join(SUMMARY_COLUMNS)}) {SUMMARY_FROM_PROPOSALS}',
+)
+SELECT_SUMMARY = f'SELECT department, {", ".join(SUMMARY_COLUMNS)} FROM department_summary ORDER BY total_cost DESC'
+
+# Типизированные столбцы вычисляются из исходных (виртуальные generated columns),
+# поэтому их не нужно заполнять при вставке, а индексы по ним строятся как обычно.
+MIGRATIONS = (
+    (1, (
+        '''ALTER TABLE proposal ADD COLUMN deadline_day INTEGER
+           GENERATED ALWAYS AS (IFNULL(CAST(julianday(deadline) AS INTEGER), 0)) VIRTUAL''',
+        '''ALTER TABLE proposal ADD COLUMN priority_rank INTEGER
+           GENERATED ALWAYS AS (CASE priority WHEN 'Высокий' THEN 0 WHEN 'Средний' THEN 1
+                                              WHEN 'Низкий' THEN 2 ELSE 3 END) VIRTUAL''',
+        'CREATE INDEX IF NOT EXISTS idx_proposal_priority_deadline ON proposal(priority_rank, deadline_day)',
+        'CREATE INDEX IF NOT EXISTS idx_proposal_deadline_day ON proposal(deadline_day)',
+    )),
+    (2, (CREATE_SUMMARY, *CREATE_SUMMARY_TRIGGERS, *REBUILD_SUMMARY)),
+    # Индексы под порядок страниц (столбец сортировки, id): и листание по ключу,
+    # и переход на страницу идут по индексу без сортировки всей таблицы.
+    (3, (
+        'CREATE INDEX IF NOT EXISTS idx_proposal_priority_rank_id ON proposal(priority_rank, id)',
+        'CREATE INDEX IF NOT EXISTS idx_proposal_department_id ON proposal(department, id)',
+        'CREATE INDEX IF NOT EXISTS idx_proposal_text_id ON proposal(proposal_text, id)',
+    )),
+)
+
+PRIORITY_RANKS = {'Высокий': 0, 'Средний': 1, 'Низкий': 2}
+SORT_COLUMNS = {
+    'id': 'id',
+    'department': 'department',
+    'proposal_text': 'proposal_text',
+    'priority': 'priority_rank',
+    'deadline': 'deadline_day',
+    'cost': 'cost',
+}
+
+CREATE_FTS = '''CREATE VIRTUAL TABLE proposal_fts USING fts5
+                (proposal_text, department, content='proposal', content_rowid='id',
+                 tokenize='unicode61 remove_diacritics 2', prefix='2 3')'''
+REBUILD_FTS = "INSERT INTO proposal_fts(proposal_fts) VALUES('rebuild')"
+CREATE_FTS_TRIGGERS = (
+    '''CREATE TRIGGER IF NOT EXISTS proposal_fts_insert AFTER INSERT ON proposal BEGIN
+           INSERT INTO proposal_fts(rowid, proposal_text, department)
+           VALUES (new.id, new.proposal_text, new.department);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS proposal_fts_delete AFTER DELETE ON proposal BEGIN
+           INSERT INTO proposal_fts(proposal_fts, rowid, proposal_text, department)
+           VALUES ('delete', old.id, old.proposal_text, old.department);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS proposal_fts_update AFTER UPDATE OF proposal_text, department ON proposal BEGIN
+           INSERT INTO proposal_fts(proposal_fts, rowid, proposal_text, department)
+           VALUES ('delete', old.id, old.proposal_text, old.department);
+           INSERT INTO proposal_fts(rowid, proposal_text, department)
+           VALUES (new.id, new.proposal_text, new.department);
+       END''',
+)
+FTS_EXISTS = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'proposal_fts'"
+
+COLUMNS = 'id, department, proposal_text, priority, deadline, cost'
+
+SELECT_ALL = f'SELECT {COLUMNS} FROM proposal'
+COUNT_ALL = 'SELECT COUNT(*) FROM proposal'
+INSERT_PROPOSAL = 'INSERT INTO proposal (department, proposal_text, priority, deadline, cost) VALUES (?, ?, ?, ?, ?)'
+INSERT_RETURNING = INSERT_PROPOSAL + f' RETURNING {COLUMNS}'
+UPDATE_RETURNING = '''UPDATE proposal
+                      SET department = ?, proposal_text = ?, priority = ?, deadline = ?, cost = ?
+                      WHERE id = ? RETURNING ''' + COLUMNS
+DELETE_PROPOSAL = 'DELETE FROM proposal WHERE id = ?'
+
+REPORT_TOTALS = 'SELECT IFNULL(SUM(proposal_count), 0), IFNULL(SUM(total_cost), 0) FROM department_summary'
+REPORT_BY_DEPARTMENT = 'SELECT department, proposal_count, total_cost FROM department_summary ORDER BY 3 DESC'
+REPORT_BY_PRIORITY = '''SELECT 'Высокий', IFNULL(SUM(high_count), 0), IFNULL(SUM(high_cost), 0) FROM department_summary
+                        UNION ALL
+                        SELECT 'Средний', IFNULL(SUM(medium_count), 0), IFNULL(SUM(medium_cost), 0) FROM department_summary
+                        UNION ALL
+                        SELECT 'Низкий', IFNULL(SUM(low_count), 0), IFNULL(SUM(low_cost), 0) FROM department_summary'''
+REPORT_BY_MONTH = '''SELECT substr(deadline, 1, 7), COUNT(*), COALESCE(SUM(cost), 0) FROM proposal
+                     GROUP BY 1 ORDER BY 1'''
+REPORT_TOP = f'SELECT {COLUMNS} FROM proposal ORDER BY cost DESC LIMIT ?'
+
+SEARCH_PROPOSALS = '''SELECT p.id, p.department, p.proposal_text, p.priority, p.deadline, p.cost FROM proposal_fts f JOIN proposal p ON p.id = f.rowid
+                      WHERE proposal_fts MATCH ? ORDER BY bm25(proposal_fts) LIMIT ?'''
+
+SEED_DATA = [
+    ('Пивной отдел Пятрерочка', 'Купить пиво', 'Высокий', '2026-03-01', 150000),
+]
+
+
+def view_filters(view):
+    where, params = [], []
+    if view.get('priorities'):
+        ranks = [PRIORITY_RANKS[p] for p in view['priorities']]
+        where.append(f'priority_rank IN ({", ".join("?" * len(ranks))})')
+        params += ranks
+    if view.get('deadline_from'):
+        where.append('deadline_day >= CAST(julianday(?) AS INTEGER)')
+        params.append(view['deadline_from'])
+    if view.get('deadline_to'):
+        where.append('deadline_day <= CAST(julianday(?) AS INTEGER)')
+        params.append(view['deadline_to'])
+    return where, params
+
+
+def view_order(view, reverse=False):
+    column = SORT_COLUMNS[view.get('sort', 'id')]
+    descending = view.get('descending', False) != reverse
+    direction = 'DESC' if descending else 'ASC'
+    return column, descending, f'ORDER BY {column} {direction}, id {direction}'
+
+
+def fts_query(text):
+    # Каждое слово ищется как фраза в кавычках, последнее - по префиксу,
+    # чтобы результаты появлялись прямо во время набора.
+    words = [w.replace('"', '""') for w in text.split()]
+    if not words:
+        return ''
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+class ProposalDB:
+    # Одно долгоживущее соединение на запись (под блокировкой) и небольшой пул
+    # соединений на чтение: в режиме WAL читатели не мешают писателю.
+    # Одиночные изменения идут через очередь в поток записи, который собирает
+    # всё, что накопилось, и фиксирует пачку одной транзакцией (group commit).
+    def __init__(self, path=DB_PATH, pool_size=4):
+        self.path = path
+        self.pool_size = pool_size
+        self.lock = threading.Lock()
+        self.readers = queue.LifoQueue()
+        self.closed = False
+        self.closing = False
+        self.submit_lock = threading.Lock()
+        self.conn = self.connect(autocommit=True)
+        self.jobs = queue.SimpleQueue()
+        self.write_thread = threading.Thread(target=self.write_loop, name='proposal-writer', daemon=True)
+        self.write_thread.start()
+
+    def connect(self, autocommit=False):
+        # Соединению на запись транзакции открываются явно через BEGIN IMMEDIATE:
+        # отложенный BEGIN при конкуренции нескольких процессов приводит к
+        # "database is locked", который busy_timeout уже не спасает.
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256,
+                               isolation_level=None if autocommit else '')
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def reader(self):
+        try:
+            conn = self.readers.get_nowait()
+        except queue.Empty:
+            conn = self.connect()
+        try:
+            yield conn
+        finally:
+            if self.closed or self.readers.qsize() >= self.pool_size:
+                conn.close()
+            else:
+                self.readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        with self.lock:
+            if self.closed:
+                raise sqlite3.ProgrammingError('База данных уже закрыта')
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+
+    def submit(self, job):
+        # Проверка и постановка в очередь - под одной блокировкой с close(),
+        # иначе задание может встать после метки остановки и не выполниться.
+        future = Future()
+        with self.submit_lock:
+            if self.closing:
+                raise sqlite3.ProgrammingError('База данных уже закрыта')
+            self.jobs.put((job, future))
+        return future
+
+    def write(self, job):
+        return self.submit(job).result()
+
+    def write_loop(self):
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < GROUP_COMMIT_SIZE:
+                try:
+                    item = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self.commit_batch(batch)
+                    return
+                batch.append(item)
+            self.commit_batch(batch)
+
+    def commit_batch(self, batch):
+        # Каждое задание выполняется в своей точке сохранения: ошибка одного
+        # откатывает только его, остальные фиксируются общим COMMIT.
+        results = []
+        try:
+            with self.writer() as conn:
+                for job, future in batch:
+                    conn.execute('SAVEPOINT job')
+                    try:
+                        results.append((future, job(conn), None))
+                        conn.execute('RELEASE job')
+                    except Exception as e:
+                        conn.execute('ROLLBACK TO job')
+                        conn.execute('RELEASE job')
+                        results.append((future, None, e))
+        except Exception as e:
+            for job, future in batch:
+                future.set_exception(e)
+            return
+        for future, result, error in results:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def init_schema(self):
+        with self.writer() as conn:
+            conn.execute(CREATE_PROPOSAL)
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            for target, statements in MIGRATIONS:
+                if target > version:
+                    for statement in statements:
+                        conn.execute(statement)
+                    conn.execute(f'PRAGMA user_version = {target}')
+            for index in CREATE_INDEXES:
+                conn.execute(index)
+            if not conn.execute(FTS_EXISTS).fetchone():
+                conn.execute(CREATE_FTS)
+                conn.execute(REBUILD_FTS)
+            for trigger in CREATE_FTS_TRIGGERS:
+                conn.execute(trigger)
+            if conn.execute(COUNT_ALL).fetchone()[0] == 0:
+                conn.executemany(INSERT_PROPOSAL, SEED_DATA)
+
+    def get_proposals(self):
+        with self.reader() as conn:
+            return conn.execute(SELECT_ALL).fetchall()
+
+    def count_proposals(self, view=None):
+        where, params = view_filters(view or {})
+        sql = COUNT_ALL + (' WHERE ' + ' AND '.join(where) if where else '')
+        with self.reader() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def get_page(self, view=None, after=None, before=None, offset=0, limit=50):
+        # Листание по ключу (столбец сортировки, id): after/before - ключ
+        # последней/первой строки текущей страницы. Последний столбец строки -
+        # значение столбца сортировки, из него UI берёт ключи границ страницы.
+        view = view or {}
+        where, params = view_filters(view)
+        column, descending, order = view_order(view, reverse=before is not None)
+        bound = after or before
+        if bound:
+            where.append(f'({column}, id) {"<" if descending else ">"} (?, ?)')
+            params += bound
+        elif offset:
+            # Переход на страницу: ключ её первой строки находит подзапрос,
+            # который проходит только индекс (столбец, id), а строки берутся
+            # поиском по этому ключу, как при листании.
+            first = f'SELECT {column}, id FROM proposal'
+            if where:
+                first += ' WHERE ' + ' AND '.join(where)
+            first += f' {order} LIMIT 1 OFFSET ?'
+            where.append(f'({column}, id) {"<=" if descending else ">="} ({first})')
+            params += params + [offset]
+        sql = f'SELECT {COLUMNS}, {column} FROM proposal'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' {order} LIMIT ?'
+        with self.reader() as conn:
+            rows = conn.execute(sql, params + [limit]).fetchall()
+        if before:
+            rows.reverse()
+        return rows
+
+    def search_proposals(self, text, limit=50):
+        query = fts_query(text)
+        if not query:
+            return []
+        with self.reader() as conn:
+            return conn.execute(SEARCH_PROPOSALS, (query, limit)).fetchall()
+
+    def get_top(self, n):
+        with self.reader() as conn:
+            return conn.execute(REPORT_TOP, (n,)).fetchall()
+
+    def get_report(self, top_n=0):
+        # Все агрегаты считаются в одной транзакции чтения, чтобы итоги и
+        # группировки были согласованы между собой.
+        with self.reader() as conn:
+            conn.execute('BEGIN')
+            try:
+                count, total = conn.execute(REPORT_TOTALS).fetchone()
+                report = {
+                    'count': count,
+                    'total': total,
+                    'by_department': conn.execute(REPORT_BY_DEPARTMENT).fetchall(),
+                    'by_priority': conn.execute(REPORT_BY_PRIORITY).fetchall(),
+                    'by_month': conn.execute(REPORT_BY_MONTH).fetchall(),
+                    'top': conn.execute(REPORT_TOP, (top_n,)).fetchall() if top_n else [],
+                }
+            finally:
+                conn.rollback()
+        return report
+
+    def get_summary(self):
+        with self.reader() as conn:
+            return conn.execute(SELECT_SUMMARY).fetchall()
+
+    def check_summary(self):
+        # Возвращает подразделения, для которых сводка расходится с таблицей
+        # proposal: (подразделение, значения в сводке, пересчитанные значения).
+        with self.reader() as conn:
+            conn.execute('BEGIN')
+            try:
+                stored = {r[0]: r[1:] for r in conn.execute(SELECT_SUMMARY)}
+                actual = {r[0]: r[1:] for r in conn.execute(SUMMARY_FROM_PROPOSALS)}
+            finally:
+                conn.rollback()
+        mismatches = []
+        for department in stored.keys() | actual.keys():
+            a, b = stored.get(department), actual.get(department)
+            if a is None or b is None or any(abs(x - y) > 0.005 for x, y in zip(a, b)):
+                mismatches.append((department, a, b))
+        return mismatches
+
+    def rebuild_summary(self):
+        with self.writer() as conn:
+            for statement in REBUILD_SUMMARY:
+                conn.execute(statement)
+
+    def add_proposal(self, department, proposal_text, priority, deadline, cost):
+        params = (department, proposal_text, priority, deadline, float(cost))
+        return self.write(lambda conn: conn.execute(INSERT_RETURNING, params).fetchone())
+
+    def update_proposal(self, proposal_id, department, proposal_text, priority, deadline, cost):
+        params = (department, proposal_text, priority, deadline, float(cost), proposal_id)
+        return self.write(lambda conn: conn.execute(UPDATE_RETURNING, params).fetchone())
+
+    def delete_proposal(self, proposal_id):
+        return self.write(lambda conn: conn.execute(DELETE_PROPOSAL, (proposal_id,)).rowcount > 0)
+
+    def close(self):
+        with self.submit_lock:
+            if not self.closing:
+                self.closing = True
+                self.jobs.put(None)
+        self.write_thread.join()
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.conn.execute('PRAGMA optimize')
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self.conn.close()
+        while True:
+            try:
+                self.readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+if __name__ == '__main__':
+    import sys
+
+    db = ProposalDB(sys.argv[2] if len(sys.argv) > 2 else DB_PATH)
+    db.init_schema()
+    if len(sys.argv) > 1 and sys.argv[1] == 'rebuild-summary':
+        db.rebuild_summary()
+        print('Сводка по подразделениям пересчитана')
+    else:
+        mismatches = db.check_summary()
+        for department, stored, actual in mismatches:
+            print(f'{department}: в сводке {stored}, фактически {actual}')
+        print('Расхождений нет' if not mismatches else f'Расхождений: {len(mismatches)}')
+    db.close()
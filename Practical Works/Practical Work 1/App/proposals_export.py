@@ -0,0 +1,224 @@
+import csv
+import io
+import os
+import zlib
+
+from proposals_db import SELECT_ALL
+
+
+BATCH_SIZE = 5000
+PDF_ROWS_PER_PAGE = 70
+HEADER = ('Подразделение', 'Предложение', 'Приоритет', 'Срок', 'Стоимость')
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def iter_batches(db, batch_size=BATCH_SIZE):
+    # Курсор SQLite сам по себе потоковый: fetchmany отдаёт строки порциями,
+    # и в памяти никогда не бывает больше одной порции.
+    with db.reader() as conn:
+        cursor = conn.execute(SELECT_ALL + ' ORDER BY id')
+        cursor.arraysize = batch_size
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            yield rows
+
+
+def export_csv(db, path, on_progress=None, cancel=None):
+    done = 0
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(HEADER)
+        for rows in iter_batches(db):
+            if cancel and cancel.is_set():
+                raise ExportCancelled()
+            writer.writerows(r[1:] for r in rows)
+            done += len(rows)
+            if on_progress:
+                on_progress(done)
+    return done
+
+
+def shorten(text, width):
+    text = str(text)
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+class GlyphMap(dict):
+    # Таблица для str.translate: код символа -> номер глифа в hex (4 цифры).
+    # Недостающие символы добавляются при первом обращении.
+    def __init__(self, font):
+        super().__init__()
+        self.font = font
+
+    def __missing__(self, code):
+        gid = self[code] = f'{self.font.get_char_index(code):04X}'
+        return gid
+
+
+class PdfWriter:
+    # Минимальный потоковый PDF: каждая страница сразу пишется в файл, в памяти
+    # остаются только смещения объектов для таблицы xref. Текст набирается
+    # моноширинным DejaVu Sans Mono из поставки matplotlib (в нём есть кириллица),
+    # поэтому для PDF нужен matplotlib (и fontTools, который ставится вместе с ним).
+    # Шрифт встраивается при закрытии как CIDFontType2 с кодировкой Identity-H -
+    # только использованные глифы (номера глифов сохраняются).
+    PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+    FONT_SIZE = 7
+    LEADING = 10.5
+
+    def __init__(self, path):
+        try:
+            import matplotlib
+            from matplotlib import ft2font
+        except ImportError:
+            raise RuntimeError('Для экспорта в PDF нужен пакет matplotlib (pip install matplotlib)') from None
+
+        self.font_path = os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf', 'DejaVuSansMono.ttf')
+        self.font = ft2font.FT2Font(self.font_path)
+        self.no_scale = ft2font.LoadFlags.NO_SCALE if hasattr(ft2font, 'LoadFlags') else ft2font.LOAD_NO_SCALE
+        self.glyphs = GlyphMap(self.font)
+        self.offsets = {}
+        self.pages = []
+        self.next_id = 8
+        self.file = open(path, 'wb')
+        self.file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def write_object(self, obj_id, body, stream=None):
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(f'{obj_id} 0 obj\n'.encode())
+        if stream is None:
+            self.file.write(body.encode() + b'\nendobj\n')
+        else:
+            data = zlib.compress(stream, 6)
+            self.file.write(f'<< {body} /Length {len(data)} /Filter /FlateDecode >>\nstream\n'.encode())
+            self.file.write(data + b'\nendstream\nendobj\n')
+
+    def subset_font(self):
+        # Подмножество шрифта из глифов, встреченных в тексте. retain_gids
+        # оставляет номера глифов прежними (остальные пустые), поэтому
+        # уже записанные страницы и CIDToGIDMap /Identity остаются верными.
+        from fontTools import subset
+
+        options = subset.Options(retain_gids=True, notdef_outline=True, hinting=False,
+                                 layout_features=[], name_IDs=[], drop_tables=['FFTM', 'GPOS', 'GSUB'])
+        font = subset.load_font(self.font_path, options)
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(gids=[int(gid, 16) for gid in self.glyphs.values()])
+        subsetter.subset(font)
+        data = io.BytesIO()
+        subset.save_font(font, data, options)
+        return data.getvalue()
+
+    def write_font(self):
+        scale = 1000 / self.font.units_per_EM
+        width = round(self.font.load_char(ord('0'), flags=self.no_scale).horiAdvance * scale)
+        bbox = ' '.join(str(round(v * scale)) for v in self.font.bbox)
+        # Встроенное подмножество помечается шестибуквенной меткой "XXXXXX+".
+        crc = zlib.crc32(''.join(sorted(self.glyphs.values())).encode())
+        tag = ''.join(chr(65 + crc // 26 ** i % 26) for i in range(6))
+        name = f'{tag}+{self.font.postscript_name}'
+        font_data = self.subset_font()
+        self.write_object(3, f'<< /Type /Font /Subtype /Type0 /BaseFont /{name} /Encoding /Identity-H '
+                             f'/DescendantFonts [4 0 R] /ToUnicode 7 0 R >>')
+        self.write_object(4, f'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{name} '
+                             f'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> '
+                             f'/FontDescriptor 5 0 R /DW {width} /CIDToGIDMap /Identity >>')
+        self.write_object(5, f'<< /Type /FontDescriptor /FontName /{name} /Flags 33 /FontBBox [{bbox}] '
+                             f'/ItalicAngle 0 /Ascent {round(self.font.ascender * scale)} '
+                             f'/Descent {round(self.font.descender * scale)} /CapHeight 729 /StemV 80 '
+                             f'/FontFile2 6 0 R >>')
+        self.write_object(6, f'/Length1 {len(font_data)}', font_data)
+
+    def encode(self, text):
+        return text.translate(self.glyphs)
+
+    def add_page(self, title, lines):
+        top = self.PAGE_HEIGHT - 40
+        content = [f'BT /F1 11 Tf 40 {top} Td <{self.encode(title)}> Tj ET',
+                   f'BT /F1 {self.FONT_SIZE} Tf {self.LEADING} TL 40 {top - 20} Td']
+        content += [f'<{self.encode(line)}> Tj T*' for line in lines]
+        content.append('ET')
+        content.append(f'BT /F1 {self.FONT_SIZE} Tf {self.PAGE_WIDTH - 60} 20 Td '
+                       f'<{self.encode(str(len(self.pages) + 1))}> Tj ET')
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self.write_object(content_id, '', '\n'.join(content).encode())
+        self.write_object(page_id, f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.PAGE_WIDTH} {self.PAGE_HEIGHT}] '
+                                   f'/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>')
+        self.pages.append(page_id)
+
+    def close(self):
+        self.write_font()
+        cmap = [f'<{gid}> <{code:04X}>' for code, gid in self.glyphs.items() if gid != '0000' and code <= 0xFFFF]
+        chunks = [cmap[i:i + 100] for i in range(0, len(cmap), 100)]
+        to_unicode = ('/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n'
+                      '/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n'
+                      '/CMapName /Adobe-Identity-UCS def /CMapType 2 def\n'
+                      '1 begincodespacerange <0000> <FFFF> endcodespacerange\n'
+                      + ''.join(f'{len(c)} beginbfchar\n' + '\n'.join(c) + '\nendbfchar\n' for c in chunks)
+                      + 'endcmap CMapName currentdict /CMap defineresource pop end end')
+        self.write_object(7, '', to_unicode.encode())
+        kids = ' '.join(f'{p} 0 R' for p in self.pages)
+        self.write_object(2, f'<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>')
+        self.write_object(1, '<< /Type /Catalog /Pages 2 0 R >>')
+        xref = self.file.tell()
+        size = self.next_id
+        self.file.write(f'xref\n0 {size}\n0000000000 65535 f \n'.encode())
+        for obj_id in range(1, size):
+            self.file.write(f'{self.offsets[obj_id]:010d} 00000 n \n'.encode())
+        self.file.write(f'trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode())
+        self.file.close()
+
+
+def export_pdf(db, path, report=None, on_progress=None, cancel=None):
+    def format_row(r):
+        return (f'{shorten(r[1], 22):<22} {shorten(r[2], 44):<44} {shorten(r[3], 8):<8} '
+                f'{shorten(r[4], 10):<10} {r[5] or 0:>12.0f}')
+
+    done = 0
+    pdf = PdfWriter(path)
+    try:
+        if report:
+            lines = [f'Всего предложений: {report["count"]}',
+                     f'Общая стоимость: {report["total"]:.0f} руб.', '']
+            for title, key in (('Подразделение', 'by_department'), ('Приоритет', 'by_priority'),
+                               ('Месяц', 'by_month')):
+                lines.append(f'{title:<40} {"Кол-во":>10} {"Стоимость":>16}')
+                lines += [f'{shorten(name or "—", 40):<40} {count:>10} {cost:>16.0f}'
+                          for name, count, cost in report[key]]
+                lines.append('')
+            for i in range(0, len(lines), PDF_ROWS_PER_PAGE):
+                pdf.add_page('Отчет по предложениям', lines[i:i + PDF_ROWS_PER_PAGE])
+        header = f'{"Подразделение":<22} {"Предложение":<44} {"Приор.":<8} {"Срок":<10} {"Стоимость":>12}'
+        page_rows = []
+        for rows in iter_batches(db):
+            if cancel and cancel.is_set():
+                raise ExportCancelled()
+            for r in rows:
+                page_rows.append(format_row(r))
+                if len(page_rows) == PDF_ROWS_PER_PAGE:
+                    pdf.add_page('Предложения', [header] + page_rows)
+                    page_rows = []
+            done += len(rows)
+            if on_progress:
+                on_progress(done)
+        if page_rows:
+            pdf.add_page('Предложения', [header] + page_rows)
+    finally:
+        pdf.close()
+    return done
+
+
+def export_report(db, path, report=None, on_progress=None, cancel=None):
+    try:
+        if os.path.splitext(path)[1].lower() == '.pdf':
+            return export_pdf(db, path, report, on_progress, cancel)
+        return export_csv(db, path, on_progress, cancel)
+    except ExportCancelled:
+        os.remove(path)
+        raise
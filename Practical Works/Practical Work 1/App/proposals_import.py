@@ -0,0 +1,97 @@
+import csv
+import os
+from datetime import date
+
+from proposals_db import INSERT_PROPOSAL
+
+
+PRIORITIES = ('Высокий', 'Средний', 'Низкий')
+HEADERS = {
+    ('department', 'proposal_text', 'priority', 'deadline', 'cost'),
+    ('Подразделение', 'Предложение', 'Приоритет', 'Срок', 'Стоимость'),
+}
+CHUNK_SIZE = 50000
+MAX_REJECTED = 1000
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+
+def read_xlsx(path):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def read_rows(path):
+    if os.path.splitext(path)[1].lower() in ('.xlsx', '.xlsm'):
+        return read_xlsx(path)
+    return read_csv(path)
+
+
+def validate(row):
+    if len(row) < 5:
+        raise ValueError('Не хватает столбцов')
+    department, proposal_text, priority, deadline, cost = row[:5]
+    if not department or not proposal_text:
+        raise ValueError('Пустое подразделение или предложение')
+    if priority not in PRIORITIES:
+        raise ValueError(f'Неизвестный приоритет: {priority}')
+    if isinstance(deadline, date):
+        deadline = deadline.isoformat()[:10]
+    else:
+        deadline = str(deadline).strip()
+        parsed = date.fromisoformat(deadline)
+        if len(deadline) != 10:
+            deadline = parsed.isoformat()
+    if isinstance(cost, str):
+        cost = cost.replace(' ', '').replace(',', '.')
+    cost = float(cost)
+    if not cost >= 0:
+        raise ValueError(f'Некорректная стоимость: {cost}')
+    return str(department), str(proposal_text), priority, deadline, cost
+
+
+def import_proposals(db, path, chunk_size=CHUNK_SIZE, on_progress=None):
+    # Каждая пачка вставляется одним executemany в своей транзакции:
+    # при ошибке теряется только текущая пачка, а не весь файл.
+    result = {'imported': 0, 'rejected': 0, 'errors': []}
+    chunk = []
+
+    def flush():
+        with db.writer() as conn:
+            conn.executemany(INSERT_PROPOSAL, chunk)
+        result['imported'] += len(chunk)
+        chunk.clear()
+        if on_progress:
+            on_progress(result['imported'], result['rejected'])
+
+    for line, row in enumerate(read_rows(path), 1):
+        if line == 1 and tuple(str(v).strip() for v in row[:5]) in HEADERS:
+            continue
+        if not row or all(v in (None, '') for v in row):
+            continue
+        try:
+            chunk.append(validate(row))
+        except (ValueError, TypeError) as e:
+            result['rejected'] += 1
+            if len(result['errors']) < MAX_REJECTED:
+                result['errors'].append((line, str(e)))
+            continue
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return result
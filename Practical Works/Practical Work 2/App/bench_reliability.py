@@ -0,0 +1,117 @@
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import failure_log
+import reliability
+
+
+def measure(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(size=10_000_000):
+    rng = np.random.default_rng(1)
+    times = rng.exponential(250.0, size)
+    operating = rng.uniform(100.0, 1000.0, size)
+    failures = rng.integers(1, 10, size)
+    repair = rng.exponential(8.0, size)
+    times_list, operating_list, failures_list, repair_list = (
+        times.tolist(), operating.tolist(), failures.tolist(), repair.tolist())
+
+    cases = [
+        ('MTBF', lambda: sum(times_list) / len(times_list), lambda: reliability.mtbf(times)),
+        ('T0 по системам', lambda: sum(operating_list) / sum(failures_list),
+         lambda: reliability.fleet_mtbf(operating, failures)),
+        ('MTBF каждой системы', lambda: [t / n for t, n in zip(operating_list, failures_list)],
+         lambda: reliability.system_mtbf(operating, failures)),
+        ('Kг каждой системы', lambda: [t / (t + v) for t, v in zip(times_list, repair_list)],
+         lambda: reliability.availability(times, repair)),
+    ]
+    print(f'{size} записей')
+    print(f'{"":<22}{"python, мс":>12}{"numpy, мс":>12}{"x":>8}')
+    for name, python_fn, numpy_fn in cases:
+        expected, python_ms = measure(python_fn)
+        actual, numpy_ms = measure(numpy_fn)
+        assert np.allclose(expected, actual)
+        print(f'{name:<22}{python_ms:>12.1f}{numpy_ms:>12.1f}{python_ms / numpy_ms:>8.1f}')
+    print()
+    check_chunking()
+    bench_stream()
+
+
+def check_chunking(events=3000, systems=7):
+    # Журнал с частыми повторами (отказ после отказа и т. п.): итоги не должны
+    # зависеть от деления на порции и должны совпадать с построчным расчётом.
+    rng = np.random.default_rng(3)
+    systems_list = [f'С-{i}' for i in rng.integers(0, systems, events).tolist()]
+    kinds = rng.choice([failure_log.FAILURE, failure_log.REPAIR], events, p=[0.5, 0.5])
+    times = np.sort(rng.uniform(0.0, 10_000.0, events))
+
+    expected = {}
+    for name, kind, time_ in zip(systems_list, kinds.tolist(), times.tolist()):
+        state = expected.setdefault(name, {'kind': failure_log.REPAIR, 'time': 0.0,
+                                           'operating': 0.0, 'repair': 0.0, 'failures': 0})
+        if kind == state['kind']:
+            continue
+        if kind == failure_log.FAILURE:
+            state['operating'] += time_ - state['time']
+            state['failures'] += 1
+        else:
+            state['repair'] += time_ - state['time']
+        state['kind'], state['time'] = kind, time_
+
+    for chunk in (1, 2, events):
+        stats = failure_log.FailureLogStats(0.0)
+        for start in range(0, events, chunk):
+            stats.update(systems_list[start:start + chunk], kinds[start:start + chunk], times[start:start + chunk])
+        snapshot = stats.snapshot()
+        for i, name in enumerate(snapshot['systems']):
+            for key in ('operating', 'repair', 'failures'):
+                assert np.isclose(snapshot[key][i], expected[name][key]), (chunk, name, key)
+    print(f'Порции 1, 2 и {events} событий: итоги совпадают с построчным расчётом')
+
+
+def bench_stream(events=2_000_000, systems=500):
+    # Журнал отказов/восстановлений по времени; потоковый расчёт должен держать
+    # память на уровне одной порции, а не всего файла.
+    rng = np.random.default_rng(2)
+    per_system = events // (2 * systems)
+    gaps = np.empty((systems, 2 * per_system))
+    gaps[:, 0::2] = rng.exponential(250.0, (systems, per_system))
+    gaps[:, 1::2] = rng.exponential(8.0, (systems, per_system))
+    times = gaps.cumsum(axis=1)
+    order = np.argsort(times, axis=None)
+    system_ids, positions = np.unravel_index(order, times.shape)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'log.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['system', 'event', 'time'])
+            writer.writerows(zip((f'С-{i}' for i in system_ids.tolist()),
+                                 np.where(positions % 2 == 0, 'failure', 'repair').tolist(),
+                                 times[system_ids, positions].round(3).tolist()))
+        size_mb = os.path.getsize(path) / 2 ** 20
+        tracemalloc.start()
+        start = time.perf_counter()
+        for stats in failure_log.stream_log(path, origin=0.0):
+            pass
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    expected = reliability.fleet_mtbf(gaps[:, 0::2].sum(axis=1), np.full(systems, per_system))
+    assert np.isclose(stats['t0'], expected, rtol=1e-4)
+    print(f'Журнал: {stats["events"]} событий, {systems} систем, {size_mb:.0f} МБ')
+    print(f'{stats["events"] / elapsed:.0f} событий/с, пик памяти {peak:.0f} МБ, '
+          f'T0 = {stats["t0"]:.2f} ч, Kг = {stats["total_kg"]:.4f}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
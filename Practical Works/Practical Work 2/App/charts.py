@@ -0,0 +1,127 @@
+import base64
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import reliability
+
+
+CACHE_SIZE = 32
+# Выше этого числа отказов столбцы по одному не рисуются: ряд сворачивается
+# в BUCKETS корзин (мин/макс/среднее) или в гистограмму из HIST_BINS столбцов.
+AGGREGATE_THRESHOLD = 300
+BUCKETS = 500
+HIST_BINS = 60
+
+cache = OrderedDict()
+cache_lock = threading.Lock()
+
+
+def chart_key(times, title, mode):
+    # Ключ по содержимому: одинаковые данные, заголовок и вид дают тот же график.
+    digest = hashlib.blake2b(times.tobytes(), digest_size=16)
+    digest.update(f'{title}\0{mode}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def chart_mode(times, mode='auto'):
+    if mode == 'auto':
+        return 'bars' if len(times) <= AGGREGATE_THRESHOLD else 'buckets'
+    return mode
+
+
+def bucket_stats(times, buckets=BUCKETS):
+    # Мин/макс/среднее по корзинам подряд идущих отказов; x - номер первого
+    # отказа в корзине.
+    starts = np.linspace(0, times.size, min(buckets, times.size) + 1).astype(np.int64)[:-1]
+    counts = np.diff(np.r_[starts, times.size])
+    return (starts + 1, np.minimum.reduceat(times, starts), np.maximum.reduceat(times, starts),
+            np.add.reduceat(times, starts) / counts)
+
+
+def histogram_edges(times, mtbf, bins=HIST_BINS):
+    # MTBF - одна из границ, так что каждый столбец целиком выше или ниже MTBF.
+    low, high = times.min(), times.max()
+    below = max(1, round(bins * (mtbf - low) / (high - low))) if high > low else 1
+    return np.r_[np.linspace(low, mtbf, below + 1), np.linspace(mtbf, high, max(1, bins - below) + 1)[1:]]
+
+
+def draw_bars(ax, times, mtbf):
+    x = range(1, len(times) + 1)
+    colors = ['green' if above else 'red' for above in reliability.split_by_mtbf(times, mtbf)]
+    ax.bar(x, times, color=colors, alpha=0.7, label='Время до отказа')
+    ax.axhline(y=mtbf, color='blue', linestyle='--', linewidth=2, label=f'MTBF = {mtbf:.2f} ч')
+    ax.set_xlabel('Номер отказа')
+    ax.set_ylabel('Время (часы)')
+
+
+def draw_buckets(ax, times, mtbf):
+    # Огибающая мин..макс: часть выше MTBF - зелёная, ниже - красная, поэтому
+    # раскраска совпадает с поотказовой при любом размере корзины.
+    x, low, high, mean = bucket_stats(times)
+    # Последняя корзина тянется до конца ряда.
+    x, low, high, mean = np.r_[x, times.size + 1], np.r_[low, low[-1]], np.r_[high, high[-1]], np.r_[mean, mean[-1]]
+    ax.fill_between(x, np.maximum(low, mtbf), np.maximum(high, mtbf), step='post',
+                    color='green', alpha=0.4, linewidth=0)
+    ax.fill_between(x, np.minimum(low, mtbf), np.minimum(high, mtbf), step='post',
+                    color='red', alpha=0.4, linewidth=0)
+    ax.step(x, mean, where='post', color='black', linewidth=0.8, label='Среднее по корзине')
+    ax.axhline(y=mtbf, color='blue', linestyle='--', linewidth=2, label=f'MTBF = {mtbf:.2f} ч')
+    ax.set_xlabel('Номер отказа')
+    ax.set_ylabel('Время (часы)')
+
+
+def draw_histogram(ax, times, mtbf):
+    counts, edges = np.histogram(times, bins=histogram_edges(times, mtbf))
+    colors = np.where(edges[:-1] >= mtbf, 'green', 'red')
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color=colors, alpha=0.7,
+           label='Число отказов')
+    ax.axvline(x=mtbf, color='blue', linestyle='--', linewidth=2, label=f'MTBF = {mtbf:.2f} ч')
+    ax.set_xlabel('Время до отказа (часы)')
+    ax.set_ylabel('Количество')
+
+
+DRAW = {'bars': draw_bars, 'buckets': draw_buckets, 'histogram': draw_histogram}
+
+
+def render_mtbf_chart(times, title, mtbf, mode):
+    # Отдельная Figure без pyplot: рендер не трогает общее состояние и диск,
+    # поэтому параллельные сессии не мешают друг другу.
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    DRAW[mode](ax, times, mtbf)
+    above = int(np.count_nonzero(reliability.split_by_mtbf(times, mtbf)))
+    if mode != 'bars':
+        ax.set_title(f'{title}\n(выше MTBF: {above}, ниже: {times.size - above})')
+    else:
+        ax.set_title(title)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+    return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def mtbf_chart(times, title, mode='auto'):
+    # PNG в base64 для ft.Image(src_base64=...), с LRU-кэшем на CACHE_SIZE графиков.
+    # mode: 'bars', 'buckets', 'histogram' или 'auto' (по AGGREGATE_THRESHOLD).
+    times = reliability.as_array(times)
+    mode = chart_mode(times, mode)
+    key = chart_key(times, title, mode)
+    with cache_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    image = render_mtbf_chart(times, title, reliability.mtbf(times), mode)
+    with cache_lock:
+        cache[key] = image
+        cache.move_to_end(key)
+        while len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+    return image
@@ -0,0 +1,206 @@
+import csv
+import json
+import os
+from itertools import islice
+
+import numpy as np
+
+
+CHUNK_SIZE = 50_000
+FAILURE, REPAIR = 1, 2
+EVENT_KINDS = {
+    'failure': FAILURE, 'fail': FAILURE, 'отказ': FAILURE,
+    'repair': REPAIR, 'restore': REPAIR, 'восстановление': REPAIR,
+}
+
+
+class FailureLogStats:
+    # Нарастающие итоги по системам: наработка, число отказов и время
+    # восстановления. Хранится только состояние на систему (последнее событие),
+    # поэтому память не зависит от длины журнала.
+    #
+    # Интервал "восстановление -> отказ" идёт в наработку, "отказ ->
+    # восстановление" - во время ремонта. До первого события система считается
+    # работающей с момента origin (начало наблюдения).
+    def __init__(self, origin=0.0):
+        self.origin = origin
+        self.names = []
+        self.ids = {}
+        self.size = 0
+        self.last_time = np.zeros(0)
+        self.last_kind = np.zeros(0, dtype=np.int8)
+        self.operating = np.zeros(0)
+        self.repair = np.zeros(0)
+        self.failures = np.zeros(0, dtype=np.int64)
+        self.events = 0
+
+    def system_ids(self, systems):
+        # Систем сотни, событий - миллионы: словарь обходится только по
+        # уникальным именам порции.
+        names, inverse = np.unique(np.asarray(systems, dtype=str), return_inverse=True)
+        codes = np.empty(names.size, dtype=np.int64)
+        for i, name in enumerate(names.tolist()):
+            system_id = self.ids.get(name)
+            if system_id is None:
+                system_id = self.ids[name] = len(self.names)
+                self.names.append(name)
+            codes[i] = system_id
+        ids = codes[inverse.reshape(-1)]
+        if len(self.names) > self.last_time.size:
+            grow = max(len(self.names), 2 * self.last_time.size) - self.last_time.size
+            self.last_time = np.concatenate([self.last_time, np.full(grow, self.origin)])
+            self.last_kind = np.concatenate([self.last_kind, np.full(grow, REPAIR, dtype=np.int8)])
+            self.operating = np.concatenate([self.operating, np.zeros(grow)])
+            self.repair = np.concatenate([self.repair, np.zeros(grow)])
+            self.failures = np.concatenate([self.failures, np.zeros(grow, dtype=np.int64)])
+        self.size = len(self.names)
+        return ids
+
+    def update(self, systems, kinds, times):
+        ids = self.system_ids(systems)
+        kinds = np.asarray(kinds, dtype=np.int8)
+        times = np.asarray(times, dtype=np.float64)
+        if ids.size == 0:
+            return
+        order = np.lexsort((times, ids))
+        ids, kinds, times = ids[order], kinds[order], times[order]
+
+        # Тип предыдущего события той же системы решает, меняет ли событие
+        # состояние: внутри порции - соседний элемент, для первого события
+        # системы в порции - сохранённое состояние.
+        first = np.ones(ids.size, dtype=bool)
+        first[1:] = ids[1:] != ids[:-1]
+        prev_kind = np.empty_like(kinds)
+        prev_kind[1:] = kinds[:-1]
+        prev_kind[first] = self.last_kind[ids[first]]
+        failed = (kinds == FAILURE) & (prev_kind == REPAIR)
+        repaired = (kinds == REPAIR) & (prev_kind == FAILURE)
+        changes = failed | repaired
+
+        # Повтор события того же типа (два отказа подряд) не меняет состояние:
+        # интервал отсчитывается от последнего значимого события - первого из
+        # повторов. Внутри порции это последнее изменение до события той же
+        # системы, иначе - сохранённое, как если бы журнал не делился на порции.
+        position = np.arange(ids.size)
+        last_change = np.maximum.accumulate(np.where(changes, position, -1))
+        prev_change = np.empty_like(position)
+        prev_change[0], prev_change[1:] = -1, last_change[:-1]
+        group_start = np.maximum.accumulate(np.where(first, position, 0))
+        in_chunk = prev_change >= group_start
+        prev_time = np.where(in_chunk, times[np.maximum(prev_change, 0)], self.last_time[ids])
+        interval = times - prev_time
+
+        n = self.last_time.size
+        self.operating += np.bincount(ids[failed], weights=interval[failed], minlength=n)
+        self.repair += np.bincount(ids[repaired], weights=interval[repaired], minlength=n)
+        self.failures += np.bincount(ids[failed], minlength=n)
+
+        changed_ids = ids[changes]
+        if changed_ids.size:
+            last_change = np.flatnonzero(changes)[np.r_[changed_ids[1:] != changed_ids[:-1], True]]
+            self.last_time[ids[last_change]] = times[last_change]
+            self.last_kind[ids[last_change]] = kinds[last_change]
+        self.events += ids.size
+
+    def snapshot(self):
+        n = self.size
+        operating, repair, failures = self.operating[:n], self.repair[:n], self.failures[:n]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mtbf = np.where(failures > 0, operating / failures, np.nan)
+            kg = np.where(operating + repair > 0, operating / (operating + repair), np.nan)
+        total_operating, total_repair, total_failures = operating.sum(), repair.sum(), failures.sum()
+        return {
+            'events': self.events,
+            'systems': list(self.names),
+            'operating': operating.copy(),
+            'repair': repair.copy(),
+            'failures': failures.copy(),
+            'mtbf': mtbf,
+            'kg': kg,
+            't0': total_operating / total_failures if total_failures else float('nan'),
+            'total_kg': (total_operating / (total_operating + total_repair)
+                         if total_operating + total_repair else float('nan')),
+        }
+
+
+def worst_systems(stats, count):
+    # Индексы систем с наименьшим Kг; системы без данных - в конце.
+    kg = np.nan_to_num(stats['kg'], nan=2.0)
+    count = min(count, kg.size)
+    if count == 0:
+        return []
+    worst = np.argpartition(kg, count - 1)[:count]
+    return worst[np.argsort(kg[worst])].tolist()
+
+
+def parse_kinds(values):
+    names, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    codes = np.empty(names.size, dtype=np.int8)
+    for i, value in enumerate(names.tolist()):
+        kind = EVENT_KINDS.get(value.strip().lower())
+        if kind is None:
+            raise ValueError(f'Неизвестный тип события: {value}')
+        codes[i] = kind
+    return codes[inverse.reshape(-1)]
+
+
+def parse_times(values):
+    # Время - либо число часов, либо дата ISO 8601 (переводится в часы от эпохи).
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except ValueError:
+        stamps = np.asarray(values, dtype='datetime64[s]')
+        return stamps.astype(np.int64) / 3600.0
+
+
+def read_csv_chunks(path, chunk_size):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader, [])]
+        if not all(name in header for name in ('system', 'event', 'time')):
+            raise ValueError('В заголовке CSV нужны столбцы system, event, time')
+        columns = [header.index(name) for name in ('system', 'event', 'time')]
+        width = max(columns) + 1
+        while True:
+            first_line = reader.line_num + 1
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            # Пустые строки пропускаются, короткие - ошибка с номером строки.
+            if min(map(len, rows)) < width:
+                for number, row in enumerate(rows, first_line):
+                    if row and any(v.strip() for v in row) and len(row) < width:
+                        raise ValueError(f'Строка {number}: нужно столбцов не меньше {width}')
+                rows = [row for row in rows if len(row) >= width]
+                if not rows:
+                    continue
+            fields = list(zip(*rows))
+            yield [fields[c] for c in columns]
+
+
+def read_jsonl_chunks(path, chunk_size):
+    with open(path, encoding='utf-8') as f:
+        lines = (line for line in f if line.strip())
+        while True:
+            records = [json.loads(line) for line in islice(lines, chunk_size)]
+            if not records:
+                return
+            yield [[r[key] for r in records] for key in ('system', 'event', 'time')]
+
+
+def stream_log(path, chunk_size=CHUNK_SIZE, origin=None):
+    # Генератор: после каждой порции отдаёт текущую сводку, чтобы UI мог
+    # показывать промежуточные значения MTBF и Kг. Журнал должен идти по
+    # времени (внутри порции порядок не важен). Если origin не задан,
+    # началом наблюдения считается время первого события журнала.
+    if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson'):
+        chunks = read_jsonl_chunks(path, chunk_size)
+    else:
+        chunks = read_csv_chunks(path, chunk_size)
+    stats = None
+    for systems, kinds, times in chunks:
+        times = parse_times(times)
+        if stats is None:
+            stats = FailureLogStats(float(times.min()) if origin is None else origin)
+        stats.update(systems, parse_kinds(kinds), times)
+        yield stats.snapshot()
@@ -0,0 +1,69 @@
+import queue
+import sqlite3
+import threading
+
+
+DB_PATH = 'history.db'
+HISTORY_LIMIT = 200
+
+CREATE_HISTORY = '''
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    created TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+    text TEXT NOT NULL
+)
+'''
+SELECT_LAST = 'SELECT text FROM (SELECT id, text FROM history ORDER BY id DESC LIMIT ?) ORDER BY id'
+INSERT_ENTRY = 'INSERT INTO history (text) VALUES (?)'
+# Кольцевой буфер на диске: после вставки остаются только последние limit записей.
+TRIM_HISTORY = 'DELETE FROM history WHERE id <= (SELECT MAX(id) FROM history) - ?'
+
+
+class HistoryDB:
+    # История расчётов в SQLite. Запись идёт в отдельном потоке пачками,
+    # чтобы обработчики кнопок не ждали диск.
+    def __init__(self, path=DB_PATH, limit=HISTORY_LIMIT):
+        self.path = path
+        self.limit = limit
+        self.queue = queue.Queue()
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(CREATE_HISTORY)
+        conn.commit()
+        conn.close()
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+    def load(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return [text for (text,) in conn.execute(SELECT_LAST, (self.limit,))]
+        finally:
+            conn.close()
+
+    def add(self, text):
+        self.queue.put(text)
+
+    def write_loop(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        while True:
+            entries = [self.queue.get()]
+            while True:
+                try:
+                    entries.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = None in entries
+            entries = [(text,) for text in entries if text is not None]
+            if entries:
+                with conn:
+                    conn.executemany(INSERT_ENTRY, entries)
+                    conn.execute(TRIM_HISTORY, (self.limit,))
+            if closing:
+                break
+        conn.close()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
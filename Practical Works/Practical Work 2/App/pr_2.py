@@ -1,8 +1,13 @@
+import atexit
 import flet as ft
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import os
+import charts
+import failure_log
+from history_db import HistoryDB
+import reliability
+
+
+LOG_TABLE_ROWS = 20
 
 
 def main(page: ft.Page):
@@ -12,52 +17,63 @@ def main(page: ft.Page):
     result1 = ft.Text('', size=18)
     result2 = ft.Text('', size=18)
     result3 = ft.Text('', size=18)
-    history_text = ft.Text('История расчетов:', size=14, weight=ft.FontWeight.BOLD)
-    history = []
+    history_db = HistoryDB()
+    atexit.register(history_db.close)
+    # Список ограничен history_db.limit: новая запись дописывается в конец,
+    # самая старая удаляется, остальные элементы не перестраиваются.
+    history_view = ft.ListView(
+        controls=[ft.Text(text, size=14) for text in history_db.load()],
+        height=200, spacing=2, auto_scroll=True
+    )
 
     def add_history(text):
-        history.append(text)
-        history_text.value = 'История расчетов:\n' + '\n'.join(history)
-        page.update()
+        history_db.add(text)
+        history_view.controls.append(ft.Text(text, size=14))
+        if len(history_view.controls) > history_db.limit:
+            del history_view.controls[0]
+        history_view.update()
 
     def open_chart_window(times, title='Время до отказа'):
-        total_time = sum(times)
-        num_failures = len(times)
-        mtbf = total_time / num_failures
-
-        fig, ax = plt.subplots()
-        x = range(1, len(times) + 1)
-        colors = ['green' if t >= mtbf else 'red' for t in times]
-        ax.bar(x, times, color=colors, alpha=0.7, label='Время до отказа')
-        ax.axhline(y=mtbf, color='blue', linestyle='--', linewidth=2, label=f'MTBF = {mtbf:.2f} ч')
-        ax.set_xlabel('Номер отказа')
-        ax.set_ylabel('Время (часы)')
-        ax.set_title(title)
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        plt.savefig('chart.png', dpi=100, bbox_inches='tight')
-        plt.close()
+        times = reliability.as_array(times)
+        total_time = times.sum()
+        num_failures = times.size
+        mtbf = reliability.mtbf(times)
 
         calc_text = ft.Text(
             f'Расчет MTBF:\n'
-            f'Сумма времени работы: {total_time} ч\n'
+            f'Сумма времени работы: {total_time:g} ч\n'
             f'Количество отказов: {num_failures}\n'
-            f'MTBF = {total_time} / {num_failures} = {mtbf:.2f} ч',
+            f'MTBF = {total_time:g} / {num_failures} = {mtbf:.2f} ч',
             size=14
         )
 
+        image = ft.Image(src_base64=charts.mtbf_chart(times, title), width=500, height=350)
+        controls = [image, calc_text]
+
+        # Большой ряд рисуется агрегированно; вид можно переключить на гистограмму.
+        if charts.chart_mode(times) != 'bars':
+            def change_mode(e):
+                image.src_base64 = charts.mtbf_chart(times, title, e.control.value)
+                image.update()
+
+            controls.insert(0, ft.RadioGroup(
+                value='buckets',
+                on_change=change_mode,
+                content=ft.Row([
+                    ft.Radio(value='buckets', label='Ряд (мин/макс/среднее)'),
+                    ft.Radio(value='histogram', label='Гистограмма')
+                ])
+            ))
+
         dlg = ft.AlertDialog(
             title=ft.Text('График'),
-            content=ft.Column([
-                ft.Image(src='chart.png', width=500, height=350),
-                calc_text
-            ])
+            content=ft.Column(controls)
         )
         page.open(dlg)
 
     def calc_task1(e):
         times = [185, 342, 268, 220, 96, 102]
-        t0 = sum(times) / len(times)
+        t0 = reliability.mtbf(times)
         result1.value = f'Задание 1: T0 = {t0:.2f} часов'
         add_history(f'Задание 1: T0 = {t0:.2f} часов')
         open_chart_window(times, 'Время до отказа и MTBF')
@@ -69,11 +85,12 @@ def main(page: ft.Page):
             (400, 2)
         ]
 
+        operating_times = [t for t, n in data]
+        failures = [n for t, n in data]
+        times = reliability.system_mtbf(operating_times, failures)
+
         rows = []
-        times = []
-        for i, (t, n) in enumerate(data):
-            mtbf_i = t / n
-            times.append(mtbf_i)
+        for i, ((t, n), mtbf_i) in enumerate(zip(data, times)):
             rows.append(ft.DataRow(cells=[
                 ft.DataCell(ft.Text(f'Система {i+1}')),
                 ft.DataCell(ft.Text(f'{t}')),
@@ -88,9 +105,9 @@ def main(page: ft.Page):
             ft.DataColumn(ft.Text('MTBF-системы'))
         ], rows=rows)
 
-        total_t = sum(d[0] for d in data)
-        total_n = sum(d[1] for d in data)
-        t0 = total_t / total_n
+        total_t = sum(operating_times)
+        total_n = sum(failures)
+        t0 = reliability.fleet_mtbf(operating_times, failures)
         result2.value = f'Задание 2: T0 = {t0:.2f} часов'
         add_history(f'Задание 2: T0 = {t0:.2f} часов')
 
@@ -127,8 +144,7 @@ def main(page: ft.Page):
             ft.DataColumn(ft.Text('tb2, час'))
         ], rows=rows)
 
-        k1 = t01 / (t01 + tv1)
-        k2 = t02 / (t02 + tv2)
+        k1, k2 = reliability.availability([t01, t02], [tv1, tv2])
         better = 'Система 1' if k1 > k2 else 'Система 2'
 
         calc_info = ft.Text(
@@ -151,6 +167,71 @@ def main(page: ft.Page):
         )
         page.open(dlg)
 
+    log_status = ft.Text('', size=14)
+    log_result = ft.Text('', size=18)
+    log_table = ft.DataTable(columns=[
+        ft.DataColumn(ft.Text('Система')),
+        ft.DataColumn(ft.Text('Наработка, ч'), numeric=True),
+        ft.DataColumn(ft.Text('Отказов'), numeric=True),
+        ft.DataColumn(ft.Text('Восстановление, ч'), numeric=True),
+        ft.DataColumn(ft.Text('MTBF, ч'), numeric=True),
+        ft.DataColumn(ft.Text('Kг'), numeric=True)
+    ], rows=[], visible=False)
+    log_state = {'stats': None}
+
+    def open_log_chart(e):
+        stats = log_state['stats']
+        open_chart_window(stats['mtbf'][stats['failures'] > 0], 'MTBF систем по журналу')
+
+    log_chart_button = ft.Button('График MTBF систем', on_click=open_log_chart, visible=False)
+
+    def show_log_stats(stats, done):
+        # В таблице - системы с наименьшим Kг, итоги - по всему парку.
+        kg = stats['kg']
+        worst = failure_log.worst_systems(stats, LOG_TABLE_ROWS)
+        log_table.rows = [ft.DataRow(cells=[
+            ft.DataCell(ft.Text(str(stats['systems'][i]))),
+            ft.DataCell(ft.Text(f"{stats['operating'][i]:.1f}")),
+            ft.DataCell(ft.Text(f"{stats['failures'][i]}")),
+            ft.DataCell(ft.Text(f"{stats['repair'][i]:.1f}")),
+            ft.DataCell(ft.Text(f"{stats['mtbf'][i]:.2f}")),
+            ft.DataCell(ft.Text(f'{kg[i]:.4f}'))
+        ]) for i in worst]
+        log_table.visible = True
+        log_result.value = (f"Журнал: T0 = {stats['t0']:.2f} ч, Kг = {stats['total_kg']:.4f}, "
+                            f"систем: {len(stats['systems'])}")
+        log_status.value = (f"{'Обработано' if done else 'Обрабатывается'}: "
+                            f"{stats['events']} событий")
+        page.update()
+
+    def run_log(path):
+        stats = None
+        try:
+            for stats in failure_log.stream_log(path):
+                show_log_stats(stats, False)
+        except (OSError, ValueError, KeyError) as ex:
+            log_status.value = f'Ошибка чтения журнала: {ex}'
+            page.update()
+            return
+        if stats is None:
+            log_status.value = 'Журнал пуст'
+            page.update()
+            return
+        log_state['stats'] = stats
+        log_chart_button.visible = bool(stats['failures'].any())
+        show_log_stats(stats, True)
+        add_history(f"Журнал {os.path.basename(path)}: T0 = {stats['t0']:.2f} ч, Kг = {stats['total_kg']:.4f}")
+
+    def on_log_picked(e):
+        if not e.files:
+            return
+        log_status.value = 'Чтение журнала...'
+        page.update()
+        page.run_thread(run_log, e.files[0].path)
+
+    log_picker = ft.FilePicker(on_result=on_log_picked)
+    page.overlay.append(log_picker)
+
     page.add(
         ft.Text('Задание 1: Средняя наработка на отказ', size=20, weight=ft.FontWeight.BOLD),
         ft.Text('6 отказов: 185, 342, 268, 220, 96, 102 часа'),
@@ -167,7 +248,17 @@ def main(page: ft.Page):
         ft.Button('Рассчитать', on_click=calc_task3),
         result3,
         ft.Divider(),
-        history_text
+        ft.Text('Журнал отказов', size=20, weight=ft.FontWeight.BOLD),
+        ft.Text('CSV или JSONL с полями system, event (failure/repair), time (часы или ISO-дата)'),
+        ft.Button('Загрузить журнал', on_click=lambda e: log_picker.pick_files(
+            allowed_extensions=['csv', 'jsonl', 'ndjson'])),
+        log_status,
+        log_result,
+        log_table,
+        log_chart_button,
+        ft.Divider(),
+        ft.Text('История расчетов:', size=14, weight=ft.FontWeight.BOLD),
+        history_view
     )
 
 
@@ -0,0 +1,43 @@
+import numpy as np
+
+
+def as_array(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def mtbf(times):
+    # Средняя наработка на отказ T0 = Σt / n по интервалам между отказами.
+    times = as_array(times)
+    if times.size == 0:
+        raise ValueError('Нет данных об отказах')
+    return float(times.sum() / times.size)
+
+
+def system_mtbf(operating_times, failures):
+    # Наработка на отказ каждой системы: t_i / n_i.
+    operating_times, failures = as_array(operating_times), as_array(failures)
+    if np.any(failures <= 0):
+        raise ValueError('Количество отказов должно быть больше 0')
+    return operating_times / failures
+
+
+def fleet_mtbf(operating_times, failures):
+    # T0 по совокупности систем: Σt_i / Σn_i.
+    operating_times, failures = as_array(operating_times), as_array(failures)
+    total_failures = failures.sum()
+    if total_failures <= 0:
+        raise ValueError('Количество отказов должно быть больше 0')
+    return float(operating_times.sum() / total_failures)
+
+
+def availability(t0, tv):
+    # Коэффициент готовности Kг = T0 / (T0 + Tв), поэлементно для массивов.
+    t0, tv = as_array(t0), as_array(tv)
+    kg = t0 / (t0 + tv)
+    return float(kg) if kg.ndim == 0 else kg
+
+
+def split_by_mtbf(times, value=None):
+    # Маска интервалов не короче MTBF: для раскраски графика.
+    times = as_array(times)
+    return times >= (mtbf(times) if value is None else value)
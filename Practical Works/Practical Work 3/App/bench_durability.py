@@ -0,0 +1,103 @@
+import math
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import durability
+import lifetime_fit
+
+try:
+    from scipy.special import ndtri
+except ImportError:
+    ndtri = None
+
+
+def old_quantile(p):
+    # Прежнее приближение из pr_3.py - для сравнения точности.
+    return math.sqrt(2) * (p - 0.5) / (1 - (p - 0.5) ** 2) if 0.01 <= p <= 0.99 else (
+        -2.5 if p < 0.01 else 2.5
+    )
+
+
+def measure(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def probabilities(size, rng):
+    # Половина - равномерно по (0, 1), по четверти - в левом хвосте до 1e-300
+    # и в правом до 1 - 1e-16, где грубые приближения ломаются.
+    return np.concatenate([
+        rng.random(size // 2),
+        10.0 ** -rng.uniform(0, 300, size // 4),
+        1.0 - 10.0 ** -rng.uniform(0, 16, size - size // 2 - size // 4),
+    ])
+
+
+def check(p, expected, actual):
+    finite = np.isfinite(expected)
+    assert np.array_equal(np.isinf(expected), np.isinf(actual))
+    error = np.abs(actual[finite] - expected[finite])
+    relative = error / np.maximum(np.abs(expected[finite]), 1.0)
+    assert relative.max() < 1e-13, relative.max()
+    return error.max(), relative.max()
+
+
+def main(size=10_000_000):
+    rng = np.random.default_rng(3)
+    p = probabilities(size, rng)
+    actual, numpy_ms = measure(lambda: durability.normal_quantile(p))
+
+    # Эталон: scipy.special.ndtri, без scipy - statistics.NormalDist на выборке.
+    if ndtri is not None:
+        expected, reference_ms = measure(lambda: ndtri(p))
+        reference = 'scipy.special.ndtri'
+        sample = p
+    else:
+        sample = p[rng.integers(0, size, 200_000)]
+        inv_cdf = statistics.NormalDist().inv_cdf
+        expected, reference_ms = measure(lambda: np.array([inv_cdf(x) for x in sample.tolist()]))
+        reference_ms *= size / sample.size
+        reference = 'statistics.NormalDist (оценка)'
+        actual = durability.normal_quantile(sample)
+    abs_error, rel_error = check(sample, expected, actual)
+
+    _, old_ms = measure(lambda: [old_quantile(x) for x in p[:1_000_000].tolist()])
+    old_ms *= size / 1_000_000
+
+    print(f'{size} вероятностей')
+    print(f'макс. абс. ошибка {abs_error:.2e}, макс. отн. ошибка {rel_error:.2e} (эталон: {reference})')
+    print(f'{"AS241, numpy":<34}{numpy_ms:>10.0f} мс')
+    print(f'{reference:<34}{reference_ms:>10.0f} мс')
+    print(f'{"старое приближение, цикл (оценка)":<34}{old_ms:>10.0f} мс')
+
+    # Случай из задания: Q3 = 0.005, m = 2000, σ = 400.
+    z = durability.normal_quantile(0.995)
+    print(f'Q = 0.005: z = {z:.6f} (было {old_quantile(0.995):.6f}), '
+          f't = {2000 + 400 * z:.2f} ч (было {2000 + 400 * old_quantile(0.995):.2f} ч)')
+    print()
+    bench_fit(size)
+
+
+def bench_fit(size=10_000_000):
+    # Подбор всех четырех моделей по выборкам известного распределения.
+    rng = np.random.default_rng(4)
+    cases = [
+        ('normal', rng.normal(2000, 300, size).clip(1)),
+        ('exponential', rng.exponential(800, size)),
+        ('weibull', 1500 * rng.weibull(1.7, size)),
+        ('lognormal', rng.lognormal(7, 0.4, size)),
+    ]
+    print(f'Подбор распределения, {size} наработок')
+    for name, samples in cases:
+        models, fit_ms = measure(lambda: lifetime_fit.fit_models(samples))
+        best = models[0]
+        print(f'{lifetime_fit.MODEL_NAMES[name]:<18}-> {lifetime_fit.MODEL_NAMES[best["name"]]:<18}'
+              f'{fit_ms:>8.0f} мс  {lifetime_fit.describe(best)}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,139 @@
+import re
+
+import numpy as np
+
+
+# Коэффициенты алгоритма AS241 (PPND16, Wichura 1988): относительная
+# погрешность около 1e-16 на всём интервале (0, 1), включая хвосты.
+# Порядок - от старшей степени к младшей, как ждёт np.polyval.
+CENTRAL_NUM = [2.5090809287301226727e+3, 3.3430575583588128105e+4, 6.7265770927008700853e+4,
+               4.5921953931549871457e+4, 1.3731693765509461125e+4, 1.9715909503065514427e+3,
+               1.3314166789178437745e+2, 3.3871328727963666080e+0]
+CENTRAL_DEN = [5.2264952788528545610e+3, 2.8729085735721942674e+4, 3.9307895800092710610e+4,
+               2.1213794301586595867e+4, 5.3941960214247511077e+3, 6.8718700749205790830e+2,
+               4.2313330701600911252e+1, 1.0]
+NEAR_NUM = [7.74545014278341407640e-4, 2.27238449892691845833e-2, 2.41780725177450611770e-1,
+            1.27045825245236838258e+0, 3.64784832476320460504e+0, 5.76949722146069140550e+0,
+            4.63033784615654529590e+0, 1.42343711074968357734e+0]
+NEAR_DEN = [1.05075007164441684324e-9, 5.47593808499534494600e-4, 1.51986665636164571966e-2,
+            1.48103976427480074590e-1, 6.89767334985100004550e-1, 1.67638483018380384940e+0,
+            2.05319162663775882187e+0, 1.0]
+FAR_NUM = [2.01033439929228813265e-7, 2.71155556874348757815e-5, 1.24266094738807843860e-3,
+           2.65321895265761230930e-2, 2.96560571828504891230e-1, 1.78482653991729133580e+0,
+           5.46378491116411436990e+0, 6.65790464350110377720e+0]
+FAR_DEN = [2.04426310338993978564e-15, 1.42151175831644588870e-7, 1.84631831751005468180e-5,
+           7.86869131145613259100e-4, 1.48753612908506148525e-2, 1.36929880922735805310e-1,
+           5.99832206555887937690e-1, 1.0]
+
+
+def ratio(num, den, x):
+    # Отношение многочленов по схеме Горнера с операциями на месте: без
+    # промежуточных массивов на каждом шаге, в отличие от np.polyval.
+    top = np.full_like(x, num[0])
+    bottom = np.full_like(x, den[0])
+    for a, b in zip(num[1:], den[1:]):
+        top *= x
+        top += a
+        bottom *= x
+        bottom += b
+    top /= bottom
+    return top
+
+
+def normal_quantile(p):
+    # Обратная функция стандартного нормального распределения z = Ф⁻¹(p).
+    # Принимает число или массив; p = 0 и 1 дают -inf и inf, вне [0, 1] - nan.
+    source = np.asarray(p, dtype=np.float64)
+    invalid = ~((source > 0.0) & (source < 1.0))
+    p = np.where(invalid, 0.5, source) if invalid.any() else source
+    q = p - 0.5
+    z = np.empty_like(p)
+
+    central = np.abs(q) <= 0.425
+    qc = q[central]
+    r = 0.180625 - qc * qc
+    z[central] = qc * ratio(CENTRAL_NUM, CENTRAL_DEN, r)
+
+    tail = ~central
+    if tail.any():
+        qt, pt = q[tail], p[tail]
+        r = np.sqrt(-np.log(np.minimum(pt, 1.0 - pt)))
+        near = r <= 5.0
+        value = np.empty_like(r)
+        value[near] = ratio(NEAR_NUM, NEAR_DEN, r[near] - 1.6)
+        value[~near] = ratio(FAR_NUM, FAR_DEN, r[~near] - 5.0)
+        z[tail] = np.copysign(value, qt)
+
+    if invalid.any():
+        z[invalid] = np.where(source[invalid] == 0.0, -np.inf,
+                              np.where(source[invalid] == 1.0, np.inf, np.nan))
+    return float(z) if z.ndim == 0 else z
+
+
+def parse_values(text):
+    # Список ("0.9, 0.5", "0,9; 0,5", "0,9 0,5") или диапазон "начало:конец:количество".
+    # Значения разделяются ";", пробелами или ", ", запятая внутри значения -
+    # десятичная. Слитный список через запятую ("0.9,0.5", "100,200,300")
+    # тоже разбирается, а одиночное "1,5" неоднозначно и отклоняется.
+    text = text.strip()
+    if not text:
+        raise ValueError('Пустой список значений')
+    if ':' in text:
+        parts = text.replace(',', '.').split(':')
+        if len(parts) != 3:
+            raise ValueError(f'Диапазон задается как начало:конец:количество: {text}')
+        count = int(parts[2])
+        if count < 1:
+            raise ValueError(f'Количество значений должно быть больше 0: {text}')
+        return np.linspace(float(parts[0]), float(parts[1]), count)
+    tokens = [t.strip(',') for t in re.split(r'[;\s]+|,(?=\s)', text)]
+    tokens = [t for t in tokens if t]
+    values = []
+    for token in tokens:
+        if '.' in token or (len(tokens) == 1 and token.count(',') > 1):
+            values += [v for v in token.split(',') if v]
+        elif ',' in token and len(tokens) == 1 and ';' not in text:
+            raise ValueError(f'Неоднозначная запись "{text}": дробь пишите через точку, '
+                             f'значения разделяйте ";" или ", "')
+        else:
+            values.append(token.replace(',', '.'))
+    return np.array([float(v) for v in values])
+
+
+def make_grid(q, m, sigma):
+    # Таблица Q × m × σ без материализации всех строк: квантиль считается один
+    # раз на каждое Q, а строка i восстанавливается по индексу (m, σ, Q).
+    q, m, sigma = (np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (q, m, sigma))
+    if np.any((q <= 0) | (q >= 1)):
+        raise ValueError('Вероятность отказа должна быть в интервале (0, 1)')
+    if np.any(sigma < 0):
+        raise ValueError('σ не может быть отрицательным')
+    return {
+        'q': q,
+        # Ф⁻¹(1 - Q) = -Ф⁻¹(Q): так квантиль не теряет точность при малых Q.
+        'z': -normal_quantile(q),
+        'm': m,
+        'sigma': sigma,
+        'shape': (m.size, sigma.size, q.size),
+        'size': m.size * sigma.size * q.size,
+    }
+
+
+def grid_rows(grid, start, stop):
+    # Столбцы строк [start, stop) одним векторным проходом.
+    index = np.arange(start, min(stop, grid['size']))
+    i_m, i_sigma, i_q = np.unravel_index(index, grid['shape'])
+    m, sigma, q, z = grid['m'][i_m], grid['sigma'][i_sigma], grid['q'][i_q], grid['z'][i_q]
+    return {'index': index, 'm': m, 'sigma': sigma, 'q': q, 'p': 1 - q, 'z': z, 't': m + sigma * z}
+
+
+def explain_row(grid, i):
+    # Пошаговый расчет - только для строки, которую открыли.
+    row = {key: value[0] for key, value in grid_rows(grid, i, i + 1).items()}
+    m, sigma, q, p, z, t = row['m'], row['sigma'], row['q'], row['p'], row['z'], row['t']
+    return '\n'.join([
+        f'P(t) = 1 - Q(t) = 1 - {q:g} = {p:g}',
+        f'z = Ф⁻¹(P) = -Ф⁻¹(Q) = -Ф⁻¹({q:g}) = {z:.4f}',
+        f't = m + σ × z = {m:g} + {sigma:g} × {z:.4f}',
+        f't = {t:.2f} часов',
+    ])
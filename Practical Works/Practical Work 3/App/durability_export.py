@@ -0,0 +1,72 @@
+import os
+
+from durability import grid_rows
+
+
+BATCH_SIZE = 100_000
+XLSX_MAX_ROWS = 1_048_575
+HEADER = ('m, ч', 'σ, ч', 'Q', 'P', 'z', 't, ч')
+COLUMNS = ('m', 'sigma', 'q', 'p', 'z', 't')
+# В таблице только числа, поэтому строки CSV собираются форматом, без csv.writer:
+# так в несколько раз быстрее на миллионах строк.
+CSV_ROW = '{:g};{:g};{:g};{:g};{:.6f};{:.4f}\n'.format
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def iter_batches(grid, batch_size=BATCH_SIZE):
+    # Строки считаются порциями прямо при записи: вся таблица в памяти не нужна.
+    for start in range(0, grid['size'], batch_size):
+        rows = grid_rows(grid, start, start + batch_size)
+        yield [rows[key].tolist() for key in COLUMNS]
+
+
+def write_batches(grid, write, on_progress, cancel):
+    done = 0
+    for columns in iter_batches(grid):
+        if cancel and cancel.is_set():
+            raise ExportCancelled()
+        write(columns)
+        done += len(columns[0])
+        if on_progress:
+            on_progress(done)
+    return done
+
+
+def export_csv(grid, path, on_progress=None, cancel=None):
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        f.write(';'.join(HEADER) + '\n')
+        return write_batches(grid, lambda columns: f.write(''.join(map(CSV_ROW, *columns))),
+                             on_progress, cancel)
+
+
+def export_xlsx(grid, path, on_progress=None, cancel=None):
+    from openpyxl import Workbook
+
+    if grid['size'] > XLSX_MAX_ROWS:
+        raise ValueError(f'В XLSX помещается не больше {XLSX_MAX_ROWS} строк, используйте CSV')
+    # write_only: строки сразу уходят во временный XML, а не копятся в листе.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Долговечность')
+    ws.append(HEADER)
+
+    def write(columns):
+        for row in zip(*columns):
+            ws.append(row)
+
+    done = write_batches(grid, write, on_progress, cancel)
+    wb.save(path)
+    return done
+
+
+def export_grid(grid, path, on_progress=None, cancel=None):
+    try:
+        if os.path.splitext(path)[1].lower() == '.xlsx':
+            return export_xlsx(grid, path, on_progress, cancel)
+        return export_csv(grid, path, on_progress, cancel)
+    except ExportCancelled:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
@@ -1,61 +1,263 @@
 import flet as ft
-import math
+import os
+import threading
+import time
+from datetime import datetime
+
+import durability
+import lifetime_fit
+from durability_export import ExportCancelled, export_grid
+
+
+PAGE_SIZE = 50
 
 
 def main(page: ft.Page):
     page.title = 'Показатели долговечности системы'
     page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
+    page.scroll = ft.ScrollMode.AUTO
 
     input_m = ft.TextField(label='Средняя наработка (m), часов', value='2000')
     input_sigma = ft.TextField(label='Среднеквадратическое отклонение (σ), часов', value='400')
     input_q1 = ft.TextField(label='Вероятность отказа Q1', value='0.9')
     input_q2 = ft.TextField(label='Вероятность отказа Q2', value='0.5')
     input_q3 = ft.TextField(label='Вероятность отказа Q3', value='0.005')
+    error_text = ft.Text('', color=ft.Colors.RED)
+    # Модель для расчета: нормальная с m и σ из полей или подобранная по данным.
+    model_select = ft.Dropdown(label='Распределение', value='manual', width=420, options=[
+        ft.DropdownOption(key='manual', text='Нормальное (m и σ из полей)')
+    ])
+    fit_state = {'models': {}}
 
-    def normal_quantile(p):
-        return math.sqrt(2) * (p - 0.5) / (1 - (p - 0.5) ** 2) if 0.01 <= p <= 0.99 else (
-            -2.5 if p < 0.01 else 2.5
-        )
+    def calculate_fitted(model, q_values):
+        parts = [f'Распределение: {lifetime_fit.MODEL_NAMES[model["name"]]}, {lifetime_fit.describe(model)}']
+        t_values = lifetime_fit.tail_quantile(model, q_values)
+        for i, q in enumerate(q_values):
+            parts.append(f'--- Расчет для Q({i+1}) = {q} ---\n'
+                         f'P(t) = 1 - Q(t) = 1 - {q:g} = {1 - q:g}\n'
+                         + lifetime_fit.explain_quantile(model, q))
+        parts.append(f'Ответ: t₁ = {t_values[0]:.2f} ч, t₂ = {t_values[1]:.2f} ч, t₃ = {t_values[2]:.2f} ч')
+        return parts
 
     def calculate(e):
-        m = float(input_m.value or 0)
-        sigma = float(input_sigma.value or 0)
-        q_values = [float(input_q1.value or 0), float(input_q2.value or 0), float(input_q3.value or 0)]
-
-        calc_details = f'Дано:\nСредняя наработка m = {m} часов\nСреднеквадратическое отклонение σ = {sigma} часов\n\n'
+        try:
+            m = float(input_m.value or 0)
+            sigma = float(input_sigma.value or 0)
+            q_values = [float(input_q1.value or 0), float(input_q2.value or 0), float(input_q3.value or 0)]
+            grid = durability.make_grid(q_values, m, sigma)
+        except ValueError as ex:
+            error_text.value = f'Ошибка: {ex}'
+            page.update()
+            return
+        error_text.value = ''
+        model = fit_state['models'].get(model_select.value)
+        if model is not None:
+            show_result(calculate_fitted(model, q_values))
+            return
+        t_values = durability.grid_rows(grid, 0, grid['size'])['t']
 
-        z_values = []
+        parts = [f'Дано:\nСредняя наработка m = {m} часов\nСреднеквадратическое отклонение σ = {sigma} часов']
         for i, q in enumerate(q_values):
-            p = 1 - q
-            z = normal_quantile(p)
-            z_values.append(z)
-            t = m + sigma * z
-
-            calc_details += f'--- Расчет для Q({i+1}) = {q} ---\n'
-            calc_details += f'P(t) = 1 - Q(t) = 1 - {q} = {p}\n'
-            calc_details += f'z = (P - m) / σ = ({p} - {m}) / {sigma} = {z:.4f}\n'
-            calc_details += f't = m + σ × z = {m} + {sigma} × {z:.4f}\n'
-            calc_details += f't = {t:.2f} часов\n\n'
-
-        calc_details += f'Ответ: t₁ = {m + sigma * z_values[0]:.2f} ч, t₂ = {m + sigma * z_values[1]:.2f} ч, t₃ = {m + sigma * z_values[2]:.2f} ч'
+            parts.append(f'--- Расчет для Q({i+1}) = {q} ---\n' + durability.explain_row(grid, i))
+        parts.append(f'Ответ: t₁ = {t_values[0]:.2f} ч, t₂ = {t_values[1]:.2f} ч, t₃ = {t_values[2]:.2f} ч')
+        show_result(parts)
 
+    def show_result(parts):
         dlg = ft.AlertDialog(
             title=ft.Text('Результат расчета'),
             content=ft.ListView(
-                controls=[ft.Text(calc_details, size=14)],
+                controls=[ft.Text('\n\n'.join(parts), size=14)],
                 height=350,
                 expand=True
             )
         )
         page.open(dlg)
 
+    fit_status = ft.Text('')
+    fit_table = ft.DataTable(columns=[
+        ft.DataColumn(ft.Text('Распределение')),
+        ft.DataColumn(ft.Text('Параметры')),
+        ft.DataColumn(ft.Text('ln L'), numeric=True),
+        ft.DataColumn(ft.Text('AIC'), numeric=True),
+        ft.DataColumn(ft.Text('BIC'), numeric=True)
+    ], rows=[], visible=False)
+
+    def run_fit(path):
+        try:
+            start = time.perf_counter()
+            samples = lifetime_fit.load_samples(path)
+            loaded = time.perf_counter()
+            models = lifetime_fit.fit_models(samples)
+            fitted = time.perf_counter()
+        except (OSError, ValueError) as ex:
+            fit_status.value = f'Ошибка: {ex}'
+            page.update()
+            return
+        best = models[0]
+        fit_table.rows = [ft.DataRow(selected=model is best, cells=[
+            ft.DataCell(ft.Text(lifetime_fit.MODEL_NAMES[model['name']])),
+            ft.DataCell(ft.Text(lifetime_fit.describe(model))),
+            ft.DataCell(ft.Text(f'{model["loglik"]:.1f}')),
+            ft.DataCell(ft.Text(f'{model["aic"]:.1f}')),
+            ft.DataCell(ft.Text(f'{model["bic"]:.1f}'))
+        ]) for model in models]
+        fit_table.visible = True
+        fit_state['models'] = {model['name']: model for model in models}
+        model_select.options = model_select.options[:1] + [
+            ft.DropdownOption(key=model['name'],
+                              text=f'{lifetime_fit.MODEL_NAMES[model["name"]]}: {lifetime_fit.describe(model)}')
+            for model in models
+        ]
+        model_select.value = best['name']
+        fit_status.value = (f'{os.path.basename(path)}: {samples.size} значений, чтение '
+                            f'{(loaded - start) * 1000:.0f} мс, подбор {(fitted - loaded) * 1000:.0f} мс. '
+                            f'Лучшее по AIC: {lifetime_fit.MODEL_NAMES[best["name"]]}')
+        page.update()
+
+    def on_samples_picked(e):
+        if not e.files:
+            return
+        fit_status.value = 'Подбор распределения...'
+        page.update()
+        page.run_thread(run_fit, e.files[0].path)
+
+    samples_picker = ft.FilePicker(on_result=on_samples_picked)
+    page.overlay.append(samples_picker)
+
+    # Таблица по сетке параметров: список через запятую или диапазон начало:конец:количество.
+    grid_q = ft.TextField(label='Q', value='0.001:0.999:999', width=200)
+    grid_m = ft.TextField(label='m, часов', value='1000:3000:21', width=200)
+    grid_sigma = ft.TextField(label='σ, часов', value='200, 400, 600', width=200)
+    grid_status = ft.Text('')
+    grid_state = {'grid': None, 'page': 0}
+
+    grid_table = ft.DataTable(columns=[
+        ft.DataColumn(ft.Text('№'), numeric=True),
+        ft.DataColumn(ft.Text('m, ч'), numeric=True),
+        ft.DataColumn(ft.Text('σ, ч'), numeric=True),
+        ft.DataColumn(ft.Text('Q'), numeric=True),
+        ft.DataColumn(ft.Text('z'), numeric=True),
+        ft.DataColumn(ft.Text('t, ч'), numeric=True),
+        ft.DataColumn(ft.Text(''))
+    ], rows=[], visible=False)
+    page_info = ft.Text('')
+    prev_button = ft.Button('Назад', on_click=lambda e: show_page(grid_state['page'] - 1), disabled=True)
+    next_button = ft.Button('Вперед', on_click=lambda e: show_page(grid_state['page'] + 1), disabled=True)
+
+    def open_row(i):
+        grid = grid_state['grid']
+        row = durability.grid_rows(grid, i, i + 1)
+        dlg = ft.AlertDialog(
+            title=ft.Text(f'Строка {i + 1}: m = {row["m"][0]:g}, σ = {row["sigma"][0]:g}, Q = {row["q"][0]:g}'),
+            content=ft.Text(durability.explain_row(grid, i), size=14)
+        )
+        page.open(dlg)
+
+    def show_page(number):
+        grid = grid_state['grid']
+        total_pages = max(1, -(-grid['size'] // PAGE_SIZE))
+        number = min(max(number, 0), total_pages - 1)
+        rows = durability.grid_rows(grid, number * PAGE_SIZE, (number + 1) * PAGE_SIZE)
+        grid_table.rows = [ft.DataRow(cells=[
+            ft.DataCell(ft.Text(f'{i + 1}')),
+            ft.DataCell(ft.Text(f'{m:g}')),
+            ft.DataCell(ft.Text(f'{sigma:g}')),
+            ft.DataCell(ft.Text(f'{q:g}')),
+            ft.DataCell(ft.Text(f'{z:.4f}')),
+            ft.DataCell(ft.Text(f'{t:.2f}')),
+            ft.DataCell(ft.IconButton(ft.Icons.INFO_OUTLINE, tooltip='Расчет',
+                                      on_click=lambda e, i=i: open_row(i)))
+        ]) for i, m, sigma, q, z, t in zip(rows['index'].tolist(), rows['m'].tolist(), rows['sigma'].tolist(),
+                                           rows['q'].tolist(), rows['z'].tolist(), rows['t'].tolist())]
+        grid_state['page'] = number
+        page_info.value = f'Страница {number + 1} из {total_pages}'
+        prev_button.disabled = number == 0
+        next_button.disabled = number >= total_pages - 1
+        page.update()
+
+    def build_grid(e):
+        try:
+            grid = durability.make_grid(durability.parse_values(grid_q.value),
+                                        durability.parse_values(grid_m.value),
+                                        durability.parse_values(grid_sigma.value))
+        except ValueError as ex:
+            grid_status.value = f'Ошибка: {ex}'
+            page.update()
+            return
+        grid_state['grid'] = grid
+        grid_status.value = f'Строк: {grid["size"]} ({grid["m"].size} m × {grid["sigma"].size} σ × {grid["q"].size} Q)'
+        grid_table.visible = True
+        export_csv_button.disabled = export_xlsx_button.disabled = False
+        show_page(0)
+
+    export_job = {'cancel': threading.Event()}
+    export_progress = ft.ProgressBar(width=400, value=0, visible=False)
+    export_cancel = ft.Button('Отменить экспорт', visible=False, on_click=lambda e: export_job['cancel'].set())
+    export_status = ft.Text('')
+
+    def run_export(path):
+        grid = grid_state['grid']
+
+        def on_progress(done):
+            export_progress.value = done / grid['size']
+            export_status.value = f'Экспорт: {done} из {grid["size"]} строк'
+            page.update()
+
+        export_job['cancel'].clear()
+        export_progress.value = 0
+        export_progress.visible = export_cancel.visible = True
+        page.update()
+        try:
+            done = export_grid(grid, path, on_progress, export_job['cancel'])
+            export_status.value = f'Сохранено {done} строк: {path}'
+        except ExportCancelled:
+            export_status.value = 'Экспорт отменен'
+        except (OSError, ValueError) as ex:
+            export_status.value = f'Ошибка экспорта: {ex}'
+        export_progress.visible = export_cancel.visible = False
+        page.update()
+
+    def on_save_picked(e):
+        if e.path:
+            page.run_thread(run_export, e.path)
+
+    save_picker = ft.FilePicker(on_result=on_save_picked)
+    page.overlay.append(save_picker)
+
+    def export_table(extension):
+        save_picker.save_file(file_name=f'durability_{datetime.now():%Y%m%d_%H%M%S}.{extension}',
+                              allowed_extensions=[extension])
+
+    export_csv_button = ft.Button('Экспорт CSV', on_click=lambda e: export_table('csv'), disabled=True)
+    export_xlsx_button = ft.Button('Экспорт XLSX', on_click=lambda e: export_table('xlsx'), disabled=True)
+
     page.add(
         ft.Text('Вариант 1: Показатели долговечности', size=20, weight=ft.FontWeight.BOLD),
         ft.Text('Определение значений наработок до отказа'),
         input_m, input_sigma,
         ft.Text('Вероятности отказа:'),
         input_q1, input_q2, input_q3,
-        ft.Button('Рассчитать', on_click=calculate)
+        model_select,
+        ft.Button('Рассчитать', on_click=calculate),
+        error_text,
+        ft.Divider(),
+        ft.Text('Подбор распределения по наработкам', size=20, weight=ft.FontWeight.BOLD),
+        ft.Text('Файл CSV/TXT (одно значение в строке) или NPY; лучшая модель выбирается по AIC'),
+        ft.Button('Загрузить наработки', on_click=lambda e: samples_picker.pick_files(
+            allowed_extensions=['csv', 'txt', 'npy'])),
+        fit_status,
+        fit_table,
+        ft.Divider(),
+        ft.Text('Таблица наработок по сетке параметров', size=20, weight=ft.FontWeight.BOLD),
+        ft.Text('Список через запятую или диапазон начало:конец:количество'),
+        ft.Row([grid_q, grid_m, grid_sigma], alignment=ft.MainAxisAlignment.CENTER),
+        ft.Button('Построить таблицу', on_click=build_grid),
+        grid_status,
+        grid_table,
+        ft.Row([prev_button, page_info, next_button], alignment=ft.MainAxisAlignment.CENTER),
+        ft.Row([export_csv_button, export_xlsx_button], alignment=ft.MainAxisAlignment.CENTER),
+        ft.Row([export_progress, export_cancel], alignment=ft.MainAxisAlignment.CENTER),
+        export_status
     )
 
 
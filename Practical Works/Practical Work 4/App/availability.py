@@ -0,0 +1,125 @@
+import csv
+import os
+
+import numpy as np
+
+
+HEADERS = {('component', 't', 'tv'), ('компонент', 't', 'tв')}
+SORT_COLUMNS = ('name', 't', 'tv', 'lambda', 'mu', 'kg', 'kp')
+
+
+# read_csv и read_xlsx повторяют читатели из proposals_import (ПР 1):
+# практические работы - отдельные приложения, каждое запускается из своей
+# папки App без общего пакета, поэтому код между ними не импортируется.
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+
+def read_xlsx(path):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def to_float(value):
+    if isinstance(value, str):
+        value = value.replace(' ', '').replace(',', '.')
+    return float(value)
+
+
+def load_components(path):
+    # Таблица (компонент, T, Tв): CSV с любым разделителем или XLSX,
+    # строка заголовка необязательна.
+    rows = read_xlsx(path) if os.path.splitext(path)[1].lower() in ('.xlsx', '.xlsm') else read_csv(path)
+    names, t, tv = [], [], []
+    for number, row in enumerate(rows, 1):
+        if not row or all(v in (None, '') for v in row):
+            continue
+        if number == 1 and tuple(str(v).strip().lower() for v in row[:3]) in HEADERS:
+            continue
+        if len(row) < 3:
+            raise ValueError(f'Строка {number}: нужны столбцы компонент, T, Tв')
+        try:
+            t.append(to_float(row[1]))
+            tv.append(to_float(row[2]))
+        except (TypeError, ValueError):
+            raise ValueError(f'Строка {number}: T и Tв должны быть числами')
+        names.append(str(row[0]))
+    return fleet_metrics(names, t, tv)
+
+
+def fleet_metrics(names, t, tv):
+    # λ, μ, Kг, Kп для всех компонентов одним векторным проходом.
+    t, tv = np.asarray(t, dtype=np.float64), np.asarray(tv, dtype=np.float64)
+    if t.size == 0:
+        raise ValueError('Нет ни одного компонента')
+    if np.any(t <= 0) or np.any(tv <= 0):
+        raise ValueError('T и Tв должны быть больше 0')
+    lam, mu = 1 / t, 1 / tv
+    names = np.asarray(names, dtype=str)
+    return {
+        'name': names,
+        'search': np.char.lower(names),
+        't': t,
+        'tv': tv,
+        'lambda': lam,
+        'mu': mu,
+        'kg': mu / (lam + mu),
+        'kp': lam / (lam + mu),
+        'orders': {},
+    }
+
+
+def series_availability(fleet, index=None):
+    # Последовательное соединение: Kг = ΠKг_i. Произведение тысяч чисел < 1
+    # считается через сумму логарифмов, чтобы не потерять точность.
+    kg = fleet['kg'] if index is None else fleet['kg'][index]
+    return float(np.exp(np.log(kg).sum()))
+
+
+def parallel_downtime_log10(fleet, index=None):
+    # Параллельное соединение простаивает, только когда простаивают все:
+    # Kп = ΠKп_i. Для тысяч компонентов это меньше наименьшего float, поэтому
+    # возвращается lg Kп.
+    kp = fleet['kp'] if index is None else fleet['kp'][index]
+    return float(np.log10(kp).sum())
+
+
+def parallel_availability(fleet, index=None):
+    # Kг = 1 - ΠKп_i; expm1 сохраняет точность, когда Kг очень близок к 1.
+    kp = fleet['kp'] if index is None else fleet['kp'][index]
+    return float(-np.expm1(np.log(kp).sum()))
+
+
+def sort_order(fleet, column):
+    # Сортировка по столбцу считается один раз и запоминается.
+    if column not in fleet['orders']:
+        fleet['orders'][column] = np.argsort(fleet[column], kind='stable')
+    return fleet['orders'][column]
+
+
+def view_index(fleet, sort='name', descending=False, name_filter='', kg_min=None, kg_max=None):
+    # Порядок и фильтр строк - это только массив индексов поверх уже
+    # посчитанных столбцов: смена сортировки или фильтра ничего не пересчитывает.
+    mask = np.ones(fleet['kg'].size, dtype=bool)
+    if name_filter:
+        mask &= np.char.find(fleet['search'], name_filter.lower()) >= 0
+    if kg_min is not None:
+        mask &= fleet['kg'] >= kg_min
+    if kg_max is not None:
+        mask &= fleet['kg'] <= kg_max
+    order = sort_order(fleet, sort)
+    if descending:
+        order = order[::-1]
+    return order[mask[order]]
@@ -0,0 +1,52 @@
+import sys
+import time
+
+import numpy as np
+
+import markov
+
+
+def measure(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def check_closed_form():
+    # Один элемент (T = 200 ч, Tв = 2 ч) - то же, что Kг = μ / (λ + μ) в pr_4.py.
+    lam, mu = 1 / 200, 1 / 2
+    model = markov.build_model([{'n': 1, 'k': 1, 'lambda': lam, 'mu': mu}], 1)
+    kg = markov.availability(model, markov.steady_state(model))
+    times, a = markov.transient(model, 20, 21)
+    expected_kg, expected_a = markov.two_state(lam, mu, times)
+    assert abs(kg - expected_kg) < 1e-12, kg
+    assert np.abs(a - expected_a).max() < 1e-10, np.abs(a - expected_a).max()
+    print(f'один элемент: Kг = {kg:.12f}, формула {expected_kg:.12f}, '
+          f'макс. ошибка A(t) {np.abs(a - expected_a).max():.1e}')
+
+    # 2 из 3 с одной бригадой - процесс гибели и размножения,
+    # π_f ∝ Π (n - i)·λ / μ по i < f.
+    lam, mu = 0.01, 0.2
+    model = markov.build_model([{'n': 3, 'k': 2, 'lambda': lam, 'mu': mu}], 1)
+    pi = markov.steady_state(model)
+    weights = np.cumprod([1.0, 3 * lam / mu, 2 * lam / mu, lam / mu])
+    assert np.abs(pi - weights / weights.sum()).max() < 1e-12
+    print(f'2 из 3, одна бригада: Kг = {markov.availability(model, pi):.12f}, '
+          f'формула {(weights[:2].sum() / weights.sum()):.12f}')
+
+
+def main(groups=4, n=20):
+    check_closed_form()
+    print()
+    print(f'{"состояний":>10}{"ненулевых":>12}{"сборка, мс":>12}{"Kг, мс":>10}{"A(t), мс":>10}{"Kг":>12}')
+    for count in range(1, groups + 1):
+        model, build_ms = measure(lambda: markov.build_model(
+            [{'n': n, 'k': n * 3 // 4, 'lambda': 0.01, 'mu': 0.2}] * count, 3))
+        pi, steady_ms = measure(lambda: markov.steady_state(model))
+        _, transient_ms = measure(lambda: markov.transient(model, 200, 20))
+        print(f'{model["size"]:>10}{model["generator"].nnz:>12}{build_ms:>12.0f}{steady_ms:>10.0f}'
+              f'{transient_ms:>10.0f}{markov.availability(model, pi):>12.6f}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+
+import montecarlo
+
+
+COMPONENTS = '''Насос; exp 200; exp 2
+Клапан; weibull 1.5 220; lognormal 0.5 0.6
+Датчик; lognormal 5 0.8; weibull 0.8 3
+Привод; weibull 3 1000; exp 12'''
+
+
+def measure(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main(reps=8000, horizon=200_000, workers=os.cpu_count() or 1):
+    components = montecarlo.parse_components(COMPONENTS)
+    single, single_s = measure(lambda: montecarlo.simulate(components, horizon, reps, seed=1, workers=1))
+    # Пул - принудительно, даже если объем работы ниже POOL_MIN_CYCLES.
+    montecarlo.POOL_MIN_CYCLES = 0
+    pool, pool_s = measure(lambda: montecarlo.simulate(components, horizon, reps, seed=1, workers=workers))
+
+    # Один seed - один результат при любом числе процессов.
+    assert [r['kg'] for r in single] == [r['kg'] for r in pool]
+    cycles = sum(r['cycles'] for r in single)
+    print(f'{len(components)} компонента × {reps} историй × {horizon} ч, {cycles} циклов')
+    print(f'{"процессов: 1":<16}{single_s:>8.2f} с{cycles / single_s * 60 / 1e6:>10.0f} млн циклов/мин')
+    print(f'{f"процессов: {workers}":<16}{pool_s:>8.2f} с{cycles / pool_s * 60 / 1e6:>10.0f} млн циклов/мин')
+    print()
+    # МК оценивает долю времени в работе на [0, horizon] при исправном
+    # компоненте в t = 0; с ростом горизонта она стремится к T/(T+Tв).
+    print(f'{"компонент":<10}{"Kг (МК)":>12}{"±95%":>12}{"Kг = T/(T+Tв)":>16}')
+    for r in single:
+        print(f'{r["name"]:<10}{r["kg"]:>12.6f}{r["ci"]:>12.2e}{r["analytic"]:>16.6f}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
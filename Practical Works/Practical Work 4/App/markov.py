@@ -0,0 +1,134 @@
+import numpy as np
+from scipy import sparse, stats
+from scipy.sparse import linalg
+
+
+DIRECT_SOLVE_STATES = 2000
+ITERATIONS = 5000
+UNIFORMIZATION_TERMS = 20_000
+
+
+def parse_groups(text):
+    # Одна группа в строке: n k λ μ - n одинаковых элементов, из которых для
+    # работы системы нужно не меньше k (k из n). Группы соединены последовательно.
+    groups = []
+    for number, line in enumerate(text.strip().splitlines(), 1):
+        if not line.strip():
+            continue
+        parts = line.replace(',', '.').split()
+        if len(parts) != 4:
+            raise ValueError(f'Строка {number}: нужно n k λ μ')
+        n, k, lam, mu = int(parts[0]), int(parts[1]), float(parts[2]), float(parts[3])
+        if n < 1 or not 1 <= k <= n:
+            raise ValueError(f'Строка {number}: должно быть 1 ≤ k ≤ n')
+        if lam <= 0 or mu <= 0:
+            raise ValueError(f'Строка {number}: λ и μ должны быть больше 0')
+        groups.append({'n': n, 'k': k, 'lambda': lam, 'mu': mu})
+    if not groups:
+        raise ValueError('Нет ни одной группы')
+    return groups
+
+
+def build_model(groups, crews):
+    # Состояние - число отказавших элементов в каждой группе (f_1, ..., f_G),
+    # всего Π(n_i + 1) состояний. Переходы:
+    #   отказ в группе i:        f_i -> f_i + 1 с интенсивностью (n_i - f_i)·λ_i;
+    #   восстановление в группе i: f_i -> f_i - 1 с интенсивностью
+    #       f_i·μ_i·min(1, r / F), F = Σf_j; r бригад делятся поровну между
+    #       отказавшими.
+    # Генератор собирается векторно в COO и хранится как CSR.
+    if crews < 1:
+        raise ValueError('Нужна хотя бы одна ремонтная бригада')
+    shape = tuple(g['n'] + 1 for g in groups)
+    size = int(np.prod(shape))
+    failed = np.indices(shape).reshape(len(groups), size)
+    total_failed = failed.sum(axis=0)
+    share = np.minimum(1.0, crews / np.maximum(total_failed, 1))
+    strides = np.cumprod((1,) + shape[::-1][:-1])[::-1]
+    states = np.arange(size)
+
+    rows, cols, rates = [], [], []
+    for i, group in enumerate(groups):
+        f = failed[i]
+        can_fail = f < group['n']
+        rows.append(states[can_fail])
+        cols.append(states[can_fail] + strides[i])
+        rates.append((group['n'] - f[can_fail]) * group['lambda'])
+        can_repair = f > 0
+        rows.append(states[can_repair])
+        cols.append(states[can_repair] - strides[i])
+        rates.append(f[can_repair] * group['mu'] * share[can_repair])
+    rows, cols, rates = np.concatenate(rows), np.concatenate(cols), np.concatenate(rates)
+    out_rate = np.bincount(rows, weights=rates, minlength=size)
+    generator = sparse.csr_matrix(
+        (np.r_[rates, -out_rate], (np.r_[rows, states], np.r_[cols, states])), shape=(size, size))
+
+    up = np.ones(size, dtype=bool)
+    for i, group in enumerate(groups):
+        up &= group['n'] - failed[i] >= group['k']
+    return {'generator': generator, 'up': up, 'size': size, 'shape': shape}
+
+
+def steady_state(model, rtol=1e-12):
+    # πQ = 0, Σπ = 1. Уравнения Qᵀπ = 0 линейно зависимы, поэтому π_0
+    # (все элементы исправны) фиксируется равным 1, строка и столбец состояния 0
+    # убираются, а π нормируется в конце.
+    # Небольшие цепи решаются прямым методом. На решетках из 10^5 состояний
+    # LU дает огромное заполнение, поэтому там - BiCGSTAB с диагональным
+    # (Якоби) предобуславливателем: на итерацию пара умножений разреженной
+    # матрицы на вектор; если не сошелся - LGMRES.
+    a = model['generator'].T.tocsr()
+    reduced = a[1:, 1:]
+    b = -a[1:, 0].toarray().ravel()
+    if reduced.shape[0] <= DIRECT_SOLVE_STATES:
+        rest = linalg.spsolve(reduced.tocsc(), b)
+    else:
+        jacobi = sparse.diags(1 / reduced.diagonal())
+        rest, info = linalg.bicgstab(reduced, b, M=jacobi, rtol=rtol, maxiter=ITERATIONS)
+        if info != 0:
+            rest, info = linalg.lgmres(reduced, b, x0=rest, M=jacobi, rtol=rtol, maxiter=ITERATIONS)
+        if info != 0:
+            raise RuntimeError('Итерационный решатель не сошелся')
+    pi = np.maximum(np.r_[1.0, rest], 0.0)
+    return pi / pi.sum()
+
+
+def availability(model, pi):
+    return float(pi[model['up']].sum())
+
+
+def transient(model, t_end, points=50, start=None, tol=1e-12):
+    # A(t) = Σ_{up} p(t), p(t)ᵀ = p(0)ᵀ·exp(Qt). exp(Qt) не строится.
+    # Равномеризация: P = I + Q/Λ, Λ = max|q_ii|, тогда
+    #   p(t) = Σ_k Pois(k; Λt)·p(0)ᵀPᵏ,
+    # а для A(t) достаточно чисел a_k = Σ_{up} p(0)ᵀPᵏ. Одна серия умножений
+    # матрицы на вектор (до Λ·t_end + запас) дает A(t) сразу во всех точках.
+    # Если членов ряда слишком много (жесткая цепь, большой горизонт) -
+    # expm_multiply. По умолчанию в начальный момент все элементы исправны.
+    if start is None:
+        start = np.zeros(model['size'])
+        start[0] = 1.0
+    times = np.linspace(0.0, t_end, points)
+    generator = model['generator']
+    rate = float(-generator.diagonal().min())
+    terms = int(stats.poisson.isf(tol, rate * t_end)) + 1 if rate > 0 else 1
+    if terms > UNIFORMIZATION_TERMS:
+        p = linalg.expm_multiply(generator.T.tocsr(), start, start=0.0, stop=t_end,
+                                 num=points, endpoint=True)
+        return times, p[:, model['up']].sum(axis=1)
+    step = (sparse.identity(model['size'], format='csr') + generator / max(rate, 1e-300)).T.tocsr()
+    up = model['up']
+    p = np.asarray(start, dtype=np.float64)
+    a = np.empty(terms)
+    for k in range(terms):
+        a[k] = p[up].sum()
+        p = step @ p
+    weights = stats.poisson.pmf(np.arange(terms)[:, None], rate * times[None, :])
+    return times, a @ weights
+
+
+def two_state(lam, mu, times):
+    # Замкнутая форма для одного восстанавливаемого элемента.
+    times = np.asarray(times, dtype=np.float64)
+    kg = mu / (lam + mu)
+    return kg, kg + (1 - kg) * np.exp(-(lam + mu) * times)
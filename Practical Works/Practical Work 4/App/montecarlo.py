@@ -0,0 +1,164 @@
+import math
+import multiprocessing
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+
+DISTRIBUTIONS = {
+    'exp': ('Экспоненциальное', 1),
+    'weibull': ('Вейбулла', 2),
+    'lognormal': ('Логнормальное', 2),
+}
+BATCH_REPS = 2000
+CHUNK_DRAWS = 1_000_000
+CONFIDENCE = 0.95
+# Запуск процессов (spawn) с импортом модулей стоит около секунды, поэтому
+# пул имеет смысл только для прогонов от нескольких секунд в одном процессе.
+POOL_MIN_CYCLES = 50_000_000
+
+
+def parse_distribution(text):
+    # exp T | weibull β η | lognormal μ s (μ и s - параметры ln t).
+    parts = text.replace(',', '.').split()
+    if not parts or parts[0].lower() not in DISTRIBUTIONS:
+        raise ValueError(f'Неизвестное распределение "{text.strip()}": нужно exp, weibull или lognormal')
+    kind = parts[0].lower()
+    if len(parts) != DISTRIBUTIONS[kind][1] + 1:
+        raise ValueError(f'"{text.strip()}": для {kind} нужно параметров: {DISTRIBUTIONS[kind][1]}')
+    params = [float(v) for v in parts[1:]]
+    if kind == 'lognormal' and params[1] <= 0 or kind != 'lognormal' and min(params) <= 0:
+        raise ValueError(f'"{text.strip()}": параметры должны быть больше 0')
+    return {'kind': kind, 'params': params}
+
+
+def parse_components(text):
+    # Один компонент в строке: имя; распределение наработки; распределение восстановления.
+    components = []
+    for number, line in enumerate(text.strip().splitlines(), 1):
+        if not line.strip():
+            continue
+        parts = line.split(';')
+        if len(parts) != 3:
+            raise ValueError(f'Строка {number}: нужно имя; наработка; восстановление')
+        try:
+            failure, repair = parse_distribution(parts[1]), parse_distribution(parts[2])
+        except ValueError as ex:
+            raise ValueError(f'Строка {number}: {ex}')
+        components.append({'name': parts[0].strip(), 'failure': failure, 'repair': repair})
+    if not components:
+        raise ValueError('Нет ни одного компонента')
+    return components
+
+
+def mean_time(dist):
+    p = dist['params']
+    if dist['kind'] == 'exp':
+        return p[0]
+    if dist['kind'] == 'weibull':
+        return p[1] * math.gamma(1 + 1 / p[0])
+    return math.exp(p[0] + p[1] ** 2 / 2)
+
+
+def describe(dist):
+    p = dist['params']
+    if dist['kind'] == 'exp':
+        return f'эксп., T = {p[0]:g} ч'
+    if dist['kind'] == 'weibull':
+        return f'Вейбулла, β = {p[0]:g}, η = {p[1]:g} ч'
+    return f'логнорм., μ = {p[0]:g}, s = {p[1]:g}'
+
+
+def draw(rng, dist, size):
+    p = dist['params']
+    if dist['kind'] == 'exp':
+        return rng.exponential(p[0], size)
+    if dist['kind'] == 'weibull':
+        values = rng.weibull(p[0], size)
+        values *= p[1]
+        return values
+    return rng.lognormal(p[0], p[1], size)
+
+
+def simulate_batch(failure, repair, horizon, reps, seed):
+    # reps независимых историй одного компонента на [0, horizon]; в t = 0
+    # компонент исправен. Циклы "работа + восстановление" разыгрываются
+    # матрицами (история × цикл) сразу для всех незавершенных историй, пока
+    # каждая не выйдет за горизонт. Возвращает долю времени в работе по
+    # каждой истории и число начатых циклов.
+    rng = np.random.default_rng(seed)
+    cycle_mean = mean_time(failure) + mean_time(repair)
+    elapsed = np.zeros(reps)
+    uptime = np.zeros(reps)
+    cycles = 0
+    active = np.arange(reps)
+    while active.size:
+        left = horizon - elapsed[active]
+        width = int(min(max(left.max() / cycle_mean * 1.2 + 4, 1), max(CHUNK_DRAWS // active.size, 1)))
+        up = draw(rng, failure, (active.size, width))
+        cycle = draw(rng, repair, (active.size, width))
+        cycle += up
+        # left - cycle_start = время от начала цикла до горизонта.
+        left = left[:, None] - np.cumsum(cycle, axis=1)
+        left += cycle
+        cycles += int(np.count_nonzero(left > 0))
+        np.clip(left, 0, up, out=left)
+        uptime[active] += left.sum(axis=1)
+        elapsed[active] += cycle.sum(axis=1)
+        active = active[elapsed[active] < horizon]
+    return uptime / horizon, cycles
+
+
+def simulate(components, horizon, reps, seed=0, workers=None, progress=None):
+    # Задачи - пакеты по BATCH_REPS историй одного компонента, у каждого
+    # пакета свой поток случайных чисел из SeedSequence(seed).spawn. Разбиение
+    # не зависит от числа процессов, поэтому при том же seed результат тот же
+    # при любом workers. Kг - среднее по историям доли времени в работе на
+    # [0, horizon] (с ростом горизонта стремится к T/(T+Tв) при любых
+    # распределениях), интервал - нормальный, по выборочному отклонению.
+    if horizon <= 0 or reps < 2:
+        raise ValueError('Горизонт должен быть больше 0, историй - не меньше 2')
+    tasks = []
+    for c, stream in enumerate(np.random.SeedSequence(seed).spawn(len(components))):
+        sizes = [BATCH_REPS] * (reps // BATCH_REPS) + ([reps % BATCH_REPS] if reps % BATCH_REPS else [])
+        for size, child in zip(sizes, stream.spawn(len(sizes))):
+            tasks.append((c, size, child))
+    parts = [None] * len(tasks)
+    workers = workers or os.cpu_count() or 1
+    # Ожидаемое число циклов работа-ремонт - оценка объема работы.
+    cycles = sum(reps * horizon / (mean_time(c['failure']) + mean_time(c['repair'])) for c in components)
+
+    if workers == 1 or len(tasks) == 1 or cycles < POOL_MIN_CYCLES:
+        for i, (c, size, child) in enumerate(tasks):
+            parts[i] = simulate_batch(components[c]['failure'], components[c]['repair'], horizon, size, child)
+            if progress:
+                progress(i + 1, len(tasks))
+    else:
+        # spawn: форк процесса с потоками Flet может унаследовать занятые блокировки.
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {pool.submit(simulate_batch, components[c]['failure'], components[c]['repair'],
+                                   horizon, size, child): i for i, (c, size, child) in enumerate(tasks)}
+            for done, future in enumerate(as_completed(futures), 1):
+                parts[futures[future]] = future.result()
+                if progress:
+                    progress(done, len(tasks))
+
+    z = statistics.NormalDist().inv_cdf((1 + CONFIDENCE) / 2)
+    results = []
+    for c, component in enumerate(components):
+        own = [part for task, part in zip(tasks, parts) if task[0] == c]
+        values = np.concatenate([part[0] for part in own])
+        mean, std = values.mean(), values.std(ddof=1)
+        up, down = mean_time(component['failure']), mean_time(component['repair'])
+        results.append({
+            'name': component['name'],
+            'kg': float(mean),
+            'ci': float(z * std / math.sqrt(values.size)),
+            'std': float(std),
+            'cycles': sum(part[1] for part in own),
+            'analytic': up / (up + down),
+        })
+    return results
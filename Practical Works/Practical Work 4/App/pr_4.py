@@ -1,10 +1,23 @@
 import flet as ft
-import math
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import availability
+import markov
+import montecarlo
+
+
+PAGE_SIZE = 50
+EXAMPLE_COMPONENTS = '''Насос; exp 200; exp 2
+Клапан; weibull 1.5 220; lognormal 0.5 0.6
+Датчик; lognormal 5 0.8; weibull 0.8 3'''
 
 
 def main(page: ft.Page):
     page.title = 'Комплексные показатели надежности'
     page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
+    page.scroll = ft.ScrollMode.AUTO
 
     input_t = ft.TextField(label='Средняя наработка на отказ (T), часов', value='200')
     input_tv = ft.TextField(label='Среднее время восстановления (Tв), часов', value='2')
@@ -41,11 +54,241 @@ def main(page: ft.Page):
         )
         page.open(dlg)
 
+    # Парк компонентов: показатели считаются один раз при загрузке, сортировка
+    # и фильтр меняют только массив индексов view['index'].
+    view = {'fleet': None, 'index': None, 'sort': 'name', 'descending': False, 'page': 0}
+    fleet_status = ft.Text('')
+    rollup_text = ft.Text('', size=16)
+    name_filter = ft.TextField(label='Компонент содержит', width=220, on_change=lambda e: apply_view())
+    kg_min_input = ft.TextField(label='Kг от', width=120, on_change=lambda e: apply_view())
+    kg_max_input = ft.TextField(label='Kг до', width=120, on_change=lambda e: apply_view())
+    page_info = ft.Text('')
+
+    def on_sort(e):
+        view['sort'] = availability.SORT_COLUMNS[e.column_index]
+        view['descending'] = not e.ascending
+        fleet_table.sort_column_index = e.column_index
+        fleet_table.sort_ascending = e.ascending
+        apply_view()
+
+    fleet_table = ft.DataTable(columns=[
+        ft.DataColumn(ft.Text('Компонент'), on_sort=on_sort),
+        ft.DataColumn(ft.Text('T, ч'), numeric=True, on_sort=on_sort),
+        ft.DataColumn(ft.Text('Tв, ч'), numeric=True, on_sort=on_sort),
+        ft.DataColumn(ft.Text('λ, 1/ч'), numeric=True, on_sort=on_sort),
+        ft.DataColumn(ft.Text('μ, 1/ч'), numeric=True, on_sort=on_sort),
+        ft.DataColumn(ft.Text('Kг'), numeric=True, on_sort=on_sort),
+        ft.DataColumn(ft.Text('Kп'), numeric=True, on_sort=on_sort)
+    ], rows=[], visible=False)
+
+    def parse_bound(field):
+        try:
+            return float(field.value.replace(',', '.')) if field.value.strip() else None
+        except ValueError:
+            return None
+
+    def show_page(number):
+        fleet, index = view['fleet'], view['index']
+        total_pages = max(1, -(-index.size // PAGE_SIZE))
+        number = min(max(number, 0), total_pages - 1)
+        rows = index[number * PAGE_SIZE:(number + 1) * PAGE_SIZE]
+        fleet_table.rows = [ft.DataRow(cells=[
+            ft.DataCell(ft.Text(fleet['name'][i])),
+            ft.DataCell(ft.Text(f'{fleet["t"][i]:g}')),
+            ft.DataCell(ft.Text(f'{fleet["tv"][i]:g}')),
+            ft.DataCell(ft.Text(f'{fleet["lambda"][i]:.6f}')),
+            ft.DataCell(ft.Text(f'{fleet["mu"][i]:.6f}')),
+            ft.DataCell(ft.Text(f'{fleet["kg"][i]:.6f}')),
+            ft.DataCell(ft.Text(f'{fleet["kp"][i]:.6f}'))
+        ]) for i in rows.tolist()]
+        view['page'] = number
+        page_info.value = f'Страница {number + 1} из {total_pages}'
+        page.update()
+
+    def apply_view():
+        fleet = view['fleet']
+        if fleet is None:
+            return
+        index = availability.view_index(fleet, view['sort'], view['descending'], name_filter.value.strip(),
+                                        parse_bound(kg_min_input), parse_bound(kg_max_input))
+        view['index'] = index
+        total = fleet['kg'].size
+
+        def rollup(label, index=None):
+            return (f'{label}: последовательно Kг = {availability.series_availability(fleet, index):.6g}, '
+                    f'параллельно Kг = {availability.parallel_availability(fleet, index):.9f} '
+                    f'(Kп = 10^{availability.parallel_downtime_log10(fleet, index):.1f})')
+
+        lines = [rollup(f'Весь парк ({total})')]
+        if 0 < index.size < total:
+            lines.append(rollup(f'Отобрано ({index.size})', index))
+        elif index.size == 0:
+            lines.append('Под фильтр не попал ни один компонент')
+        rollup_text.value = '\n'.join(lines)
+        show_page(0)
+
+    def on_fleet_picked(e):
+        if not e.files:
+            return
+        path = e.files[0].path
+        try:
+            fleet = availability.load_components(path)
+        except (OSError, ValueError) as ex:
+            fleet_status.value = f'Ошибка: {ex}'
+            page.update()
+            return
+        view['fleet'] = fleet
+        fleet_status.value = f'{os.path.basename(path)}: {fleet["kg"].size} компонентов'
+        fleet_table.visible = True
+        apply_view()
+
+    fleet_picker = ft.FilePicker(on_result=on_fleet_picked)
+    page.overlay.append(fleet_picker)
+
+    # Марковская модель: группы k из n, соединенные последовательно, с общими
+    # ремонтными бригадами. Расчет идет в фоне - на 10^5 состояний это секунды.
+    groups_input = ft.TextField(label='Группы: n k λ μ (по одной в строке)', multiline=True,
+                                min_lines=3, value='3 2 0.005 0.5\n2 1 0.002 0.25', width=420)
+    crews_input = ft.TextField(label='Ремонтных бригад', value='1', width=200)
+    horizon_input = ft.TextField(label='Горизонт t, часов', value='100', width=200)
+    markov_result = ft.Text('')
+    markov_buttons = []
+
+    def run_markov(with_transient):
+        try:
+            groups = markov.parse_groups(groups_input.value)
+            crews = int(crews_input.value)
+            horizon = float(horizon_input.value.replace(',', '.'))
+            if with_transient and horizon <= 0:
+                raise ValueError('Горизонт должен быть больше 0')
+            start = time.perf_counter()
+            model = markov.build_model(groups, crews)
+            built = time.perf_counter()
+            kg = markov.availability(model, markov.steady_state(model))
+            solved = time.perf_counter()
+            lines = [f'Состояний: {model["size"]}, ненулевых элементов генератора: {model["generator"].nnz}',
+                     f'Стационарный Kг = {kg:.9f}, Kп = {1 - kg:.3e}',
+                     f'Построение {(built - start) * 1000:.0f} мс, решение {(solved - built) * 1000:.0f} мс']
+            if with_transient:
+                times, a = markov.transient(model, horizon, 11)
+                lines.append(f'A(t) при всех исправных в t = 0 ({(time.perf_counter() - solved) * 1000:.0f} мс):')
+                lines += [f'  t = {t:10.2f} ч   A(t) = {value:.9f}' for t, value in zip(times, a)]
+            markov_result.value = '\n'.join(lines)
+        except (ValueError, RuntimeError, MemoryError) as ex:
+            markov_result.value = f'Ошибка: {ex}'
+        for button in markov_buttons:
+            button.disabled = False
+        page.update()
+
+    def start_markov(with_transient):
+        for button in markov_buttons:
+            button.disabled = True
+        markov_result.value = 'Расчет...'
+        page.update()
+        page.run_thread(run_markov, with_transient)
+
+    markov_buttons += [
+        ft.Button('Стационарный Kг', on_click=lambda e: start_markov(False)),
+        ft.Button('Kг и A(t)', on_click=lambda e: start_markov(True))
+    ]
+
+    # Имитационное моделирование: произвольные распределения наработки и
+    # восстановления, пакеты историй считаются в пуле процессов.
+    mc_components = ft.TextField(label='Компоненты: имя; наработка; восстановление', multiline=True,
+                                 min_lines=3, width=520, value=EXAMPLE_COMPONENTS)
+    mc_horizon = ft.TextField(label='Горизонт, часов', value='100000', width=160)
+    mc_reps = ft.TextField(label='Историй', value='4000', width=120)
+    mc_seed = ft.TextField(label='Seed', value='0', width=100)
+    mc_status = ft.Text('')
+    mc_progress = ft.ProgressBar(width=520, value=0, visible=False)
+    mc_table = ft.DataTable(columns=[
+        ft.DataColumn(ft.Text('Компонент')),
+        ft.DataColumn(ft.Text('Наработка')),
+        ft.DataColumn(ft.Text('Восстановление')),
+        ft.DataColumn(ft.Text('Kг (МК)'), numeric=True),
+        ft.DataColumn(ft.Text(f'±{montecarlo.CONFIDENCE:.0%}'), numeric=True),
+        ft.DataColumn(ft.Text('T/(T+Tв)'), numeric=True),
+        ft.DataColumn(ft.Text('Циклов'), numeric=True)
+    ], rows=[], visible=False)
+
+    def mc_step(done, total):
+        mc_progress.value = done / total
+        page.update()
+
+    def run_simulation():
+        try:
+            components = montecarlo.parse_components(mc_components.value)
+            horizon = float(mc_horizon.value.replace(',', '.'))
+            start = time.perf_counter()
+            results = montecarlo.simulate(components, horizon, int(mc_reps.value), int(mc_seed.value),
+                                          progress=mc_step)
+        except (ValueError, MemoryError) as ex:
+            mc_status.value = f'Ошибка: {ex}'
+        except BrokenProcessPool:
+            mc_status.value = 'Ошибка: процесс моделирования аварийно завершился'
+        else:
+            elapsed = time.perf_counter() - start
+            cycles = sum(r['cycles'] for r in results)
+            mc_table.rows = [ft.DataRow(cells=[
+                ft.DataCell(ft.Text(r['name'])),
+                ft.DataCell(ft.Text(montecarlo.describe(c['failure']))),
+                ft.DataCell(ft.Text(montecarlo.describe(c['repair']))),
+                ft.DataCell(ft.Text(f'{r["kg"]:.6f}')),
+                ft.DataCell(ft.Text(f'{r["ci"]:.1e}')),
+                ft.DataCell(ft.Text(f'{r["analytic"]:.6f}')),
+                ft.DataCell(ft.Text(str(r['cycles'])))
+            ]) for c, r in zip(components, results)]
+            mc_table.visible = True
+            mc_status.value = (f'{cycles} циклов за {elapsed:.1f} с '
+                               f'({cycles / max(elapsed, 1e-9) * 60 / 1e6:.0f} млн циклов/мин)')
+        mc_progress.visible = False
+        mc_button.disabled = False
+        page.update()
+
+    def start_simulation(e):
+        mc_button.disabled = True
+        mc_progress.value = 0
+        mc_progress.visible = True
+        mc_status.value = 'Моделирование...'
+        page.update()
+        page.run_thread(run_simulation)
+
+    mc_button = ft.Button('Моделировать', on_click=start_simulation)
+
     page.add(
         ft.Text('Вариант 1: Комплексные показатели надежности', size=20, weight=ft.FontWeight.BOLD),
         ft.Text('Расчет коэффициента готовности и коэффициента простоя'),
         input_t, input_tv,
-        ft.Button('Рассчитать', on_click=calculate)
+        ft.Button('Рассчитать', on_click=calculate),
+        ft.Divider(),
+        ft.Text('Парк компонентов', size=20, weight=ft.FontWeight.BOLD),
+        ft.Text('Таблица CSV или XLSX со столбцами: компонент, T, Tв'),
+        ft.Button('Загрузить таблицу', on_click=lambda e: fleet_picker.pick_files(
+            allowed_extensions=['csv', 'xlsx'])),
+        fleet_status,
+        rollup_text,
+        ft.Row([name_filter, kg_min_input, kg_max_input], alignment=ft.MainAxisAlignment.CENTER),
+        fleet_table,
+        ft.Row([
+            ft.Button('Назад', on_click=lambda e: show_page(view['page'] - 1)),
+            page_info,
+            ft.Button('Вперед', on_click=lambda e: show_page(view['page'] + 1))
+        ], alignment=ft.MainAxisAlignment.CENTER),
+        ft.Divider(),
+        ft.Text('Резервированная система (марковская модель)', size=20, weight=ft.FontWeight.BOLD),
+        ft.Text('Группы k из n соединены последовательно; бригады делятся поровну между отказавшими элементами'),
+        groups_input,
+        ft.Row([crews_input, horizon_input], alignment=ft.MainAxisAlignment.CENTER),
+        ft.Row(markov_buttons, alignment=ft.MainAxisAlignment.CENTER),
+        markov_result,
+        ft.Divider(),
+        ft.Text('Имитационное моделирование (Монте-Карло)', size=20, weight=ft.FontWeight.BOLD),
+        ft.Text('Распределения: exp T, weibull β η, lognormal μ s'),
+        mc_components,
+        ft.Row([mc_horizon, mc_reps, mc_seed, mc_button], alignment=ft.MainAxisAlignment.CENTER),
+        mc_progress,
+        mc_status,
+        mc_table
     )
 
 
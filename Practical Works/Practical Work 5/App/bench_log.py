@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import time
+
+from log_console import LogBuffer, LogFileWriter
+
+
+OLD_MAX_LINES = 30_000
+LINE = 'Пакет #123456: ПК1 -> ПК3, Размер: 321 байт'
+
+
+def old_console(lines):
+    # Прежний журнал: после каждой строки весь текст консоли уходил клиенту
+    # (здесь - кодируется, как при отправке).
+    value = ''
+    for i in range(lines):
+        value += f'[12:00:00.000] {LINE}\n'
+        value.encode('utf-8')
+    return value
+
+
+def new_console(lines, path):
+    sink = LogFileWriter(path)
+    buffer = LogBuffer(sink=sink)
+    for i in range(lines):
+        buffer.add('INFO', LINE, i)
+    sink.close()
+
+
+def main(lines=1_000_000):
+    print(f'{"строк":>10}{"старый, мкс/строку":>22}{"буфер + файл, мкс/строку":>28}')
+    with tempfile.TemporaryDirectory() as folder:
+        for count in (10_000, 30_000, 100_000, lines):
+            old_us = '-'
+            if count <= OLD_MAX_LINES:
+                start = time.perf_counter()
+                old_console(count)
+                old_us = f'{(time.perf_counter() - start) / count * 1e6:.2f}'
+            path = os.path.join(folder, f'{count}.log')
+            start = time.perf_counter()
+            new_console(count, path)
+            new_us = (time.perf_counter() - start) / count * 1e6
+            print(f'{count:>10}{old_us:>22}{new_us:>28.2f}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
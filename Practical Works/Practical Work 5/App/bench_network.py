@@ -0,0 +1,39 @@
+import sys
+import time
+
+from network_sim import NetworkSimulation
+
+
+def measure(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def check_low_load():
+    # При почти пустой сети очередей нет: задержка = 2 распространения +
+    # 2 передачи пакета среднего размера + обработка в коммутаторе.
+    sim = NetworkSimulation(rate=0.001, seed=2)
+    sim.run(20_000)
+    stats = sim.stats()
+    expected = 2 * sim.propagation + 2 * sum(sim.sizes) / 2 * 8 / sim.bandwidth + sim.service
+    assert abs(stats['mean_delay'] - expected) < 0.01 * expected, (stats['mean_delay'], expected)
+    print(f'малая нагрузка: средняя задержка {stats["mean_delay"]:.4f} с, без очередей {expected:.4f} с')
+
+
+def main(packets=3_000_000):
+    check_low_load()
+    print()
+    # Гигабитные каналы и нагрузка около 50% на каждый порт.
+    print(f'{"пакетов":>10}{"время, с":>10}{"пакетов/с":>12}{"доставлено":>12}{"отброшено":>11}{"задержка, мкс":>15}')
+    for count in (10_000, 100_000, 1_000_000, packets):
+        sim = NetworkSimulation(rate=600_000, bandwidth=1e9, propagation=5e-6, service=1e-6, seed=1)
+        _, elapsed = measure(lambda: sim.run(count))
+        stats = sim.stats()
+        assert stats['sent'] == stats['delivered'] + stats['dropped'] == count
+        print(f'{count:>10}{elapsed:>10.2f}{count / elapsed:>12.0f}{stats["delivered"]:>12}'
+              f'{stats["dropped"]:>11}{stats["mean_delay"] * 1e6:>15.2f}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
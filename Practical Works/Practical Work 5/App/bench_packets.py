@@ -0,0 +1,137 @@
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from packet_state import PacketState
+
+
+PCS = {'ПК1': {'x': 50, 'y': 50}, 'ПК2': {'x': 350, 'y': 50}, 'ПК3': {'x': 50, 'y': 350}, 'ПК4': {'x': 350, 'y': 350}}
+SWITCH = (200, 200)
+LEG_TICKS = 10
+
+
+def old_packets(count, rng):
+    # Пакеты как в прежнем update_packets: объекты с progress += 0.1 за такт,
+    # равномерно разбросанные по пути, чтобы доставка шла каждый такт.
+    names = list(PCS)
+    packets = []
+    for i in range(count):
+        source, destination = rng.sample(names, 2)
+        step = rng.randrange(2 * LEG_TICKS)
+        packets.append(SimpleNamespace(id=i, source=source, destination=destination,
+                                       at_switch=step >= LEG_TICKS, progress=(step % LEG_TICKS) / LEG_TICKS,
+                                       control=SimpleNamespace(left=0, top=0)))
+    return packets
+
+
+def old_tick(packets, rng, next_id):
+    # Прежний алгоритм: координаты из словаря на каждый пакет, удаление
+    # list.remove; доставленные заменяются новыми, число пакетов постоянно.
+    names = list(PCS)
+    switch_x, switch_y = SWITCH
+    packets_to_remove = []
+    for packet in packets:
+        src_data, dst_data = PCS[packet.source], PCS[packet.destination]
+        src_x, src_y = src_data['x'] + 25, src_data['y'] + 20
+        dst_x, dst_y = dst_data['x'] + 25, dst_data['y'] + 20
+        packet.progress += 0.1
+        if not packet.at_switch:
+            packet.control.left = src_x + (switch_x - src_x) * packet.progress
+            packet.control.top = src_y + (switch_y - src_y) * packet.progress
+            if packet.progress >= 1.0:
+                packet.at_switch = True
+                packet.progress = 0
+        else:
+            packet.control.left = switch_x + (dst_x - switch_x) * packet.progress
+            packet.control.top = switch_y + (dst_y - switch_y) * packet.progress
+            if packet.progress >= 1.0:
+                packets_to_remove.append(packet)
+    for packet in packets_to_remove:
+        packets.remove(packet)
+    for _ in packets_to_remove:
+        source, destination = rng.sample(names, 2)
+        next_id += 1
+        packets.append(SimpleNamespace(id=next_id, source=source, destination=destination, at_switch=False,
+                                       progress=0, control=SimpleNamespace(left=0, top=0)))
+    return next_id
+
+
+def new_state(count, rng):
+    points = [(pc['x'] + 25, pc['y'] + 20) for pc in PCS.values()]
+    state = PacketState(points, SWITCH)
+    sources = rng.integers(0, len(points), count)
+    destinations = (sources + rng.integers(1, len(points), count)) % len(points)
+    starts = -rng.uniform(0, 2 * LEG_TICKS, count)
+    for pid, (source, destination, start) in enumerate(zip(sources.tolist(), destinations.tolist(), starts.tolist())):
+        state.add(pid, source, destination, start, start + LEG_TICKS)
+    return state
+
+
+def new_tick(state, now, rng, next_id):
+    # То же в массивах: доставленные (время отрезка вышло) удаляются
+    # swap-remove, новые добавляются в конец, затем один векторный шаг.
+    n = state.count
+    done = np.flatnonzero(state.t1[:n] <= now)
+    for pid in state.id[done].tolist():
+        if state.phase[state.slot[pid]] == 0:
+            state.to_downlink(pid, state.t1[state.slot[pid]], state.t1[state.slot[pid]] + LEG_TICKS)
+        else:
+            state.remove(pid)
+            next_id += 1
+            source = rng.randrange(len(PCS))
+            state.add(next_id, source, (source + 1 + rng.randrange(len(PCS) - 1)) % len(PCS), now, now + LEG_TICKS)
+    state.step(now)
+    return next_id
+
+
+def measure(tick, ticks):
+    start = time.perf_counter()
+    for i in range(ticks):
+        tick(i)
+    return (time.perf_counter() - start) / ticks * 1000
+
+
+def main(ticks=20):
+    # "массивы" - такт целиком: 5% пакетов доставляются и заменяются новыми
+    # (swap-remove и добавление по одному, как из событий модели) + step();
+    # "step" - только векторный пересчет положений.
+    print(f'{"пакетов":>10}{"было, мс/такт":>16}{"массивы, мс/такт":>19}{"step, мс":>11}'
+          f'{"перенос в метки, мс":>22}')
+    for count in (10_000, 100_000):
+        rng = random.Random(1)
+        packets = old_packets(count, rng)
+        ids = {'old': count, 'new': count}
+
+        def run_old(i):
+            ids['old'] = old_tick(packets, rng, ids['old'])
+
+        old_ms = measure(run_old, max(2, ticks * 10_000 // count))
+
+        state = new_state(count, np.random.default_rng(1))
+
+        def run_new(i):
+            ids['new'] = new_tick(state, i + 1, rng, ids['new'])
+
+        new_ms = measure(run_new, ticks)
+        assert state.count == count and len(state.slot) == count
+        assert set(state.slot) == set(state.id[:count].tolist())
+
+        step_ms = measure(lambda i: state.step(ticks + 0.5), ticks)
+
+        # Перенос координат в контролы - как в кадре pr_5.
+        controls = [SimpleNamespace(left=0, top=0) for _ in range(count)]
+
+        def copy(i):
+            for control, (x, y) in zip(controls, state.xy[:state.count].tolist()):
+                control.left = x
+                control.top = y
+
+        copy_ms = measure(copy, ticks)
+        print(f'{count:>10}{old_ms:>16.1f}{new_ms:>19.1f}{step_ms:>11.2f}{copy_ms:>22.1f}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
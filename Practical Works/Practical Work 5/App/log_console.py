@@ -0,0 +1,107 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+
+LOG_PATH = 'network.log'
+BUFFER_LINES = 10_000
+MAX_BYTES = 5 * 1024 * 1024
+BACKUPS = 3
+LEVELS = ('DEBUG', 'INFO', 'WARN')
+
+
+class LogBuffer:
+    # Последние capacity записей в памяти. Добавление - O(1): старые записи
+    # вытесняются из deque, новые копятся в pending до следующего кадра,
+    # где консоль забирает их через take_new().
+    # Запись - (номер, время time.time(), уровень, номер пакета или None, текст).
+    # Время форматируется только для показанных строк и в потоке записи
+    # файла - strftime дороже всего остального добавления.
+    def __init__(self, capacity=BUFFER_LINES, sink=None):
+        self.records = deque(maxlen=capacity)
+        self.pending = deque(maxlen=capacity)
+        self.sink = sink
+        self.count = 0
+
+    def add(self, level, message, packet=None):
+        self.count += 1
+        record = (self.count, time.time(), level, packet, message)
+        self.records.append(record)
+        self.pending.append(record)
+        if self.sink:
+            self.sink.add(record)
+
+    def take_new(self):
+        records = list(self.pending)
+        self.pending.clear()
+        return records
+
+    def clear(self):
+        self.records.clear()
+        self.pending.clear()
+
+    def select(self, min_level='DEBUG', packet=None, limit=None):
+        # Записи из буфера, прошедшие фильтры, последние limit штук.
+        records = [r for r in self.records if matches(r, min_level, packet)]
+        return records[-limit:] if limit else records
+
+
+def matches(record, min_level='DEBUG', packet=None):
+    return LEVELS.index(record[2]) >= LEVELS.index(min_level) and (packet is None or record[3] == packet)
+
+
+def format_record(record):
+    stamp = time.strftime('%H:%M:%S', time.localtime(record[1]))
+    return f'[{stamp}.{int(record[1] * 1000) % 1000:03d}] {record[2]:<5} {record[4]}'
+
+
+class LogFileWriter:
+    # Полный журнал в файле. Записи складываются в очередь, отдельный поток
+    # форматирует их и дописывает в файл пачками; при превышении max_bytes файл
+    # переименовывается в .1 (.1 - в .2 и т. д., хранится backups копий).
+    def __init__(self, path=LOG_PATH, max_bytes=MAX_BYTES, backups=BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.write_loop, daemon=True)
+        self.thread.start()
+
+    def add(self, record):
+        self.queue.put(record)
+
+    def rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f'{self.path}.{i}'):
+                os.replace(f'{self.path}.{i}', f'{self.path}.{i + 1}')
+        if self.backups > 0:
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+
+    def write_loop(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        while True:
+            records = [self.queue.get()]
+            while True:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = None in records
+            data = ''.join(f'{format_record(r)}\n' for r in records if r is not None).encode('utf-8')
+            if data:
+                if size and size + len(data) > self.max_bytes:
+                    self.rotate()
+                    size = 0
+                with open(self.path, 'ab') as f:
+                    f.write(data)
+                size += len(data)
+            if closing:
+                break
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
@@ -0,0 +1,153 @@
+import heapq
+import math
+from collections import deque
+
+import numpy as np
+
+
+HOSTS = ('ПК1', 'ПК2', 'ПК3', 'ПК4')
+ARRIVAL_CHUNK = 65536
+AT_SWITCH, DELIVERED = 1, 2
+
+
+class NetworkSimulation:
+    # Дискретно-событийная модель "ПК - коммутатор - ПК" на модельном времени
+    # (секунды), без UI. Каждый ПК подключен к коммутатору своим каналом.
+    #   - пакеты появляются пуассоновским потоком с интенсивностью rate
+    #     (пакетов/с на всю сеть), источник и получатель - случайные разные ПК;
+    #   - канал ПК -> коммутатор: очередь FIFO, передача size·8/bandwidth
+    #     и распространение propagation;
+    #   - выходной порт коммутатора: очередь FIFO не длиннее buffer пакетов
+    #     (иначе пакет отбрасывается), обработка service + передача в канал,
+    #     затем распространение до получателя.
+    # Очереди FIFO, поэтому время ухода пакета из очереди известно в момент
+    # прихода - отдельное событие на уход не нужно. В куче только два события
+    # на пакет: приход на коммутатор и доставка; моменты появления пакетов
+    # генерируются пачками numpy и идут мимо кучи.
+    # observer (необязательный) получает packet_sent, packet_at_switch,
+    # packet_delivered и packet_dropped.
+    def __init__(self, hosts=HOSTS, rate=3.0, bandwidth=8000.0, propagation=1.5, service=0.05,
+                 buffer=64, sizes=(100, 500), seed=0, observer=None):
+        if len(hosts) < 2:
+            raise ValueError('Нужно хотя бы два ПК')
+        if rate <= 0 or bandwidth <= 0 or propagation < 0 or service < 0 or buffer < 1:
+            raise ValueError('Некорректные параметры сети')
+        self.hosts = list(hosts)
+        self.rate = rate
+        self.bandwidth = bandwidth
+        self.propagation = propagation
+        self.service = service
+        self.buffer = buffer
+        self.sizes = sizes
+        self.observer = observer
+        self.rng = np.random.default_rng(seed)
+
+        self.now = 0.0
+        self.events = []
+        self.packets = {}
+        self.uplink_free = [0.0] * len(self.hosts)
+        self.ports = [deque() for _ in self.hosts]
+        self.sent = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+        self.arrivals = iter(())
+        self.next_arrival = None
+        self.last_arrival = 0.0
+        self.refill()
+
+    def refill(self):
+        # Следующая пачка моментов появления пакетов с источниками,
+        # получателями и размерами.
+        n, count = len(self.hosts), ARRIVAL_CHUNK
+        times = self.last_arrival + np.cumsum(self.rng.exponential(1 / self.rate, count))
+        sources = self.rng.integers(0, n, count)
+        destinations = (sources + self.rng.integers(1, n, count)) % n
+        sizes = self.rng.integers(self.sizes[0], self.sizes[1] + 1, count)
+        self.last_arrival = float(times[-1])
+        self.arrivals = zip(times.tolist(), sources.tolist(), destinations.tolist(), sizes.tolist())
+        self.next_arrival = next(self.arrivals)
+
+    def set_rate(self, rate):
+        # Поток пуассоновский, поэтому уже разыгранные моменты можно отбросить
+        # и начать новую пачку с текущего момента.
+        if rate <= 0:
+            raise ValueError('Интенсивность должна быть больше 0')
+        self.rate = rate
+        self.last_arrival = self.now
+        self.refill()
+
+    def run_until(self, t_end):
+        self.advance(t_end, math.inf)
+        self.now = max(self.now, t_end)
+
+    def run(self, packets):
+        # Отправить еще packets пакетов и дождаться, пока все они будут
+        # доставлены или отброшены.
+        self.advance(math.inf, self.sent + packets)
+
+    def advance(self, t_end, limit):
+        events, packets, ports = self.events, self.packets, self.ports
+        uplink_free, observer = self.uplink_free, self.observer
+        push, pop = heapq.heappush, heapq.heappop
+        bits, propagation, service, buffer = 8 / self.bandwidth, self.propagation, self.service, self.buffer
+        arrival, sent = self.next_arrival, self.sent
+        while True:
+            if sent < limit and arrival[0] <= t_end and (not events or arrival[0] <= events[0][0]):
+                t, source, destination, size = arrival
+                pid = sent = self.sent = sent + 1
+                self.now = t
+                start = max(t, uplink_free[source])
+                uplink_free[source] = start + size * bits
+                packets[pid] = (source, destination, size, t)
+                push(events, (start + size * bits + propagation, pid, AT_SWITCH))
+                if observer:
+                    observer.packet_sent(pid, source, destination, size, t, start,
+                                         start + size * bits + propagation)
+                arrival = next(self.arrivals, None)
+                if arrival is None:
+                    self.refill()
+                    arrival = self.next_arrival
+                continue
+            if not events or events[0][0] > t_end:
+                break
+            t, pid, kind = pop(events)
+            self.now = t
+            if kind == AT_SWITCH:
+                source, destination, size, created = packets[pid]
+                queue = ports[destination]
+                while queue and queue[0] <= t:
+                    queue.popleft()
+                if len(queue) >= buffer:
+                    del packets[pid]
+                    self.dropped += 1
+                    if observer:
+                        observer.packet_dropped(pid, t)
+                    continue
+                depart = max(t, queue[-1] if queue else t) + service + size * bits
+                queue.append(depart)
+                push(events, (depart + propagation, pid, DELIVERED))
+                if observer:
+                    observer.packet_at_switch(pid, t, depart, depart + propagation)
+            else:
+                created = packets.pop(pid)[3]
+                delay = t - created
+                self.delivered += 1
+                self.total_delay += delay
+                if delay > self.max_delay:
+                    self.max_delay = delay
+                if observer:
+                    observer.packet_delivered(pid, t, delay)
+        self.next_arrival = arrival
+
+    def stats(self):
+        return {
+            'time': self.now,
+            'sent': self.sent,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'in_flight': len(self.packets),
+            'mean_delay': self.total_delay / self.delivered if self.delivered else 0.0,
+            'max_delay': self.max_delay,
+        }
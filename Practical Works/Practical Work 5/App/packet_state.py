@@ -0,0 +1,92 @@
+import numpy as np
+
+
+INITIAL_CAPACITY = 1024
+UPLINK, AT_SWITCH, DOWNLINK = 0, 1, 2
+
+
+class PacketState:
+    # Состояние пакетов в пути - набор заранее выделенных массивов numpy
+    # (структура массивов), строки 0..count-1 заняты. Для каждого пакета
+    # хранится текущий отрезок пути: концы (from, to) и моменты модельного
+    # времени начала и конца (t0, t1); step() одним векторным проходом
+    # считает progress и положение (x, y) всех пакетов.
+    # Удаление - перенос последней строки на место удаляемой (swap-remove),
+    # O(1) без сдвига массивов; slot хранит строку каждого пакета.
+    # Координаты узлов считаются один раз: points[i] - точка i-го ПК,
+    # switch - точка коммутатора.
+    def __init__(self, points, switch, capacity=INITIAL_CAPACITY):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.switch = np.asarray(switch, dtype=np.float64)
+        self.count = 0
+        self.slot = {}
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        old, count = getattr(self, 'capacity', 0), self.count
+        self.capacity = capacity
+        for name, dtype in (('id', np.int64), ('phase', np.int8), ('destination', np.int64),
+                            ('from_xy', np.float64), ('to_xy', np.float64), ('xy', np.float64),
+                            ('t0', np.float64), ('t1', np.float64), ('progress', np.float64)):
+            shape = (capacity, 2) if name.endswith('xy') else capacity
+            array = np.zeros(shape, dtype=dtype)
+            if old:
+                array[:count] = getattr(self, name)[:count]
+            setattr(self, name, array)
+
+    def add(self, pid, source, destination, t0, t1):
+        # Новый пакет на отрезке ПК -> коммутатор.
+        if self.count == self.capacity:
+            self.allocate(self.capacity * 2)
+        i = self.count
+        self.count += 1
+        self.slot[pid] = i
+        self.id[i] = pid
+        self.phase[i] = UPLINK
+        self.destination[i] = destination
+        self.from_xy[i] = self.points[source]
+        self.to_xy[i] = self.switch
+        self.xy[i] = self.points[source]
+        self.t0[i], self.t1[i] = t0, t1
+        self.progress[i] = 0.0
+        return i
+
+    def to_downlink(self, pid, t0, t1):
+        # Пакет на коммутаторе: следующий отрезок коммутатор -> получатель,
+        # до момента t0 пакет стоит в очереди порта.
+        i = self.slot[pid]
+        self.phase[i] = AT_SWITCH
+        self.from_xy[i] = self.switch
+        self.to_xy[i] = self.points[self.destination[i]]
+        self.t0[i], self.t1[i] = t0, t1
+        return i
+
+    def remove(self, pid):
+        # Возвращает (строка, id пакета, перенесенного на ее место, или None).
+        i = self.slot.pop(pid)
+        last = self.count - 1
+        self.count = last
+        if i == last:
+            return i, None
+        moved = int(self.id[last])
+        for array in (self.id, self.phase, self.destination, self.from_xy, self.to_xy, self.xy,
+                      self.t0, self.t1, self.progress):
+            array[i] = array[last]
+        self.slot[moved] = i
+        return i, moved
+
+    def step(self, now):
+        # progress = (now - t0) / (t1 - t0), ограниченный [0, 1];
+        # xy = from + (to - from)·progress.
+        n = self.count
+        if n == 0:
+            return
+        t0, progress, phase = self.t0[:n], self.progress[:n], self.phase[:n]
+        np.subtract(now, t0, out=progress)
+        progress /= np.maximum(self.t1[:n] - t0, 1e-12)
+        np.clip(progress, 0.0, 1.0, out=progress)
+        phase[(phase == AT_SWITCH) & (progress > 0)] = DOWNLINK
+        xy = self.xy[:n]
+        np.subtract(self.to_xy[:n], self.from_xy[:n], out=xy)
+        xy *= progress[:, None]
+        xy += self.from_xy[:n]
@@ -1,19 +1,19 @@
+import atexit
 import flet as ft
-import random
 import time
 import threading
-from datetime import datetime
 
-class Packet:
-    def __init__(self, packet_id, source, destination, size):
-        self.id = packet_id
-        self.source = source
-        self.destination = destination
-        self.size = size
-        self.start_time = time.time()
-        self.at_switch = False
-        self.progress = 0
-        self.control = ft.Container()
+from log_console import LogBuffer, LogFileWriter, format_record, matches
+from network_sim import NetworkSimulation
+from packet_state import PacketState
+from render import RenderScheduler
+
+SIM_STEP = 0.01
+FPS = 30
+RENDER_REPORT_TIME = 0.5
+VISIBLE_LINES = 300
+LEVEL_COLORS = {"DEBUG": "grey", "INFO": "green", "WARN": "orange"}
+
 
 class NetworkTerminal:
     def __init__(self, page: ft.Page):
@@ -23,11 +23,7 @@ class NetworkTerminal:
         self.page.window.height = 700
         
         self.running = False
-        self.packet_counter = 0
-        self.packets = []
-        self.packets_sent = 0
-        self.packets_delivered = 0
-        self.total_delay = 0
+        self.sim = None
         
         self.pcs = {
             "ПК1": {"x": 50, "y": 50},
@@ -36,24 +32,50 @@ class NetworkTerminal:
             "ПК4": {"x": 350, "y": 350}
         }
         
+        self.hosts = list(self.pcs)
         self.switch_x = 200
         self.switch_y = 200
         self.speed = 3
         
-        self.packet_controls = []
+        # Пакеты в пути: положение, отрезок пути и его моменты - в массивах
+        # PacketState; метка пакета в строке i - network_area.controls[packet_base + i].
+        self.packets = PacketState([self.host_point(i) for i in range(len(self.hosts))],
+                                   (self.switch_x, self.switch_y))
+        self.stats_changed = False
+        self.render_report_at = 0
+        
+        # Журнал: последние строки - в кольцевом буфере, полный - в файле
+        # (пишется в фоне). Консоль показывает только последние VISIBLE_LINES.
+        self.log_file = LogFileWriter()
+        atexit.register(self.log_file.close)
+        self.log_buffer = LogBuffer(sink=self.log_file)
+        self.log_filter = {"level": "DEBUG", "packet": None, "changed": False}
+        
+        # Все изменения контролов отправляются клиенту только из кадров
+        # планировщика; модель и обработчики лишь отмечают, что изменилось.
+        self.render = RenderScheduler(page, FPS)
+        self.render.add_hook(self.update_packets)
+        self.render.add_hook(self.refresh_stats)
+        self.render.add_hook(self.report_render)
+        self.render.add_hook(self.refresh_console)
         
         self.setup_ui()
+        self.render.start()
     
     def setup_ui(self):
-        self.console = ft.TextField(
-            multiline=True,
-            read_only=True,
-            width=380,
-            height=450,
-            bgcolor="black",
-            color="green",
-            text_style=ft.TextStyle(font_family="Courier")
+        self.console = ft.ListView(spacing=0, auto_scroll=True)
+        self.level_filter = ft.Dropdown(
+            label="Уровень",
+            width=170,
+            value="DEBUG",
+            options=[
+                ft.DropdownOption(key="DEBUG", text="Все"),
+                ft.DropdownOption(key="INFO", text="INFO и выше"),
+                ft.DropdownOption(key="WARN", text="Только WARN")
+            ],
+            on_change=self.on_filter_change
         )
+        self.packet_filter = ft.TextField(label="Пакет #", width=120, on_change=self.on_filter_change)
         
         self.speed_slider = ft.Slider(
             min=1,
@@ -66,11 +88,25 @@ class NetworkTerminal:
         
         self.stats_text = ft.Text("Пакетов отправлено: 0\nПакетов доставлено: 0", size=14)
         
+        self.fps_slider = ft.Slider(
+            min=5,
+            max=60,
+            divisions=11,
+            label="{value} кадров/с",
+            value=FPS,
+            on_change=lambda e: self.render.set_fps(int(e.control.value))
+        )
+        self.render_text = ft.Text("", size=12, color="grey")
+        
+        self.batch_input = ft.TextField(label="Пакетов", value="1000000", width=150)
+        self.batch_btn = ft.ElevatedButton("Прогон без анимации", on_click=self.run_batch)
+        
         self.network_area = ft.Stack(
             width=450,
             height=450,
             controls=self.create_network_controls()
         )
+        self.packet_base = len(self.network_area.controls)
         
         start_btn = ft.ElevatedButton("Старт", on_click=self.start_simulation, bgcolor="green")
         stop_btn = ft.ElevatedButton("Стоп", on_click=self.stop_simulation, bgcolor="red")
@@ -83,7 +119,11 @@ class NetworkTerminal:
                 ft.Row([start_btn, stop_btn, clear_btn]),
                 ft.Text("Скорость передачи (пакетов/сек):"),
                 self.speed_slider,
-                self.stats_text
+                ft.Text("Частота отрисовки (кадров/сек):"),
+                self.fps_slider,
+                self.stats_text,
+                self.render_text,
+                ft.Row([self.batch_input, self.batch_btn])
             ]),
             padding=10
         )
@@ -91,7 +131,14 @@ class NetworkTerminal:
         right_panel = ft.Container(
             content=ft.Column([
                 ft.Text("Консоль логов", size=20, weight=ft.FontWeight.BOLD),
-                self.console
+                ft.Row([self.level_filter, self.packet_filter]),
+                ft.Container(
+                    content=self.console,
+                    width=380,
+                    height=400,
+                    bgcolor="black",
+                    padding=5
+                )
             ]),
             padding=10
         )
@@ -140,118 +187,209 @@ class NetworkTerminal:
         
         return controls
     
-    def log(self, message):
-        timestamp = datetime.now().strftime("[%H:%M:%S.%f")[:-3] + "]"
-        if self.console.value is None:
-            self.console.value = ""
-        self.console.value += f"{timestamp} {message}\n"
-        self.console.update()
+    def log(self, message, level="INFO", packet=None):
+        # Строка только попадает в буфер и очередь файла; консоль заберет
+        # новые строки в следующем кадре.
+        with self.render.lock:
+            self.log_buffer.add(level, message, packet)
+    
+    def on_filter_change(self, e):
+        packet = self.packet_filter.value.strip().lstrip("#")
+        with self.render.lock:
+            self.log_filter["level"] = self.level_filter.value or "DEBUG"
+            self.log_filter["packet"] = int(packet) if packet.isdigit() else None
+            self.log_filter["changed"] = True
+    
+    def log_line(self, record):
+        return ft.Text(format_record(record), size=11, color=LEVEL_COLORS[record[2]], font_family="Courier")
+    
+    def refresh_console(self):
+        # Хук кадра. После смены фильтра список строится заново из буфера,
+        # иначе в конец добавляются только новые строки, а лишние сверху
+        # удаляются - клиенту уходят лишь изменения.
+        level, packet = self.log_filter["level"], self.log_filter["packet"]
+        if self.log_filter["changed"]:
+            self.log_filter["changed"] = False
+            self.log_buffer.take_new()
+            records = self.log_buffer.select(level, packet, VISIBLE_LINES)
+            self.console.controls = [self.log_line(r) for r in records]
+            self.render.mark(self.console)
+            return
+        records = [r for r in self.log_buffer.take_new() if matches(r, level, packet)]
+        if not records:
+            return
+        lines = self.console.controls
+        lines.extend(self.log_line(r) for r in records[-VISIBLE_LINES:])
+        del lines[:max(len(lines) - VISIBLE_LINES, 0)]
+        self.render.mark(self.console)
     
     def on_speed_change(self, e):
+        # Новая интенсивность применяется в потоке моделирования.
         self.speed = int(e.control.value)
     
     def start_simulation(self, e):
         if not self.running:
+            if self.sim is None:
+                self.sim = NetworkSimulation(self.hosts, rate=self.speed, seed=None, observer=self)
             self.running = True
             threading.Thread(target=self.simulation_loop, daemon=True).start()
     
     def stop_simulation(self, e):
         self.running = False
+        if self.sim is None:
+            return
+        stats = self.sim.stats()
         self.log(f"=== ИТОГОВАЯ СТАТИСТИКА ===")
-        self.log(f"Всего передано пакетов: {self.packets_sent}")
-        self.log(f"Доставлено пакетов: {self.packets_delivered}")
-        if self.packets_delivered > 0:
-            avg_delay = self.total_delay / self.packets_delivered
-            self.log(f"Средняя задержка: {avg_delay:.0f} мс")
+        self.log(f"Всего передано пакетов: {stats['sent']}")
+        self.log(f"Доставлено пакетов: {stats['delivered']}")
+        if stats['dropped'] > 0:
+            self.log(f"Отброшено пакетов: {stats['dropped']}")
+        if stats['delivered'] > 0:
+            self.log(f"Средняя задержка: {stats['mean_delay'] * 1000:.0f} мс")
     
     def clear_console(self, e):
-        self.console.value = ""
-        self.console.update()
+        # Очищается только экран и буфер, файл журнала остается.
+        with self.render.lock:
+            self.log_buffer.clear()
+            self.console.controls.clear()
+            self.render.mark(self.console)
     
     def simulation_loop(self):
+        # Модельное время идет вровень с реальным: каждые SIM_STEP модель
+        # продвигается на прошедшее время. Положения пакетов пересчитываются
+        # по модельному времени в кадрах планировщика, со своей частотой.
+        # Задержки считаются в модельном времени и не зависят от отрисовки.
+        last = time.perf_counter()
         while self.running:
-            self.create_packet()
-            self.update_packets()
-            time.sleep(1 / self.speed)
+            time.sleep(SIM_STEP)
+            now = time.perf_counter()
+            with self.render.lock:
+                if self.sim.rate != self.speed:
+                    self.sim.set_rate(self.speed)
+                self.sim.run_until(self.sim.now + now - last)
+            last = now
     
-    def create_packet(self):
-        self.packet_counter += 1
-        self.packets_sent += 1
-        
-        sources = list(self.pcs.keys())
-        source = random.choice(sources)
-        destinations = [pc for pc in sources if pc != source]
-        destination = random.choice(destinations)
-        
-        size = random.randint(100, 500)
-        
-        packet = Packet(self.packet_counter, source, destination, size)
-        
-        src_data = self.pcs[source]
-        packet.control = ft.Container(
-            content=ft.Text(f"#{packet.id}", size=8, color="black", weight=ft.FontWeight.BOLD),
+    def run_batch(self, e):
+        # Та же модель без наблюдателя - только статистика.
+        try:
+            count = int(self.batch_input.value)
+        except ValueError:
+            self.log("Ошибка: число пакетов должно быть целым", "WARN")
+            return
+        with self.render.lock:
+            self.batch_btn.disabled = True
+            self.render.mark(self.batch_btn)
+        threading.Thread(target=self.batch_loop, args=(count,), daemon=True).start()
+    
+    def batch_loop(self, count):
+        sim = NetworkSimulation(self.hosts, rate=self.speed, seed=None)
+        started = time.perf_counter()
+        sim.run(count)
+        elapsed = time.perf_counter() - started
+        stats = sim.stats()
+        self.log(f"=== ПРОГОН БЕЗ АНИМАЦИИ: {count} пакетов за {elapsed:.2f} с "
+                 f"({count / max(elapsed, 1e-9):.0f} пакетов/с) ===")
+        self.log(f"Модельное время: {stats['time']:.0f} с, доставлено: {stats['delivered']}, "
+                 f"отброшено: {stats['dropped']}")
+        self.log(f"Задержка: средняя {stats['mean_delay'] * 1000:.0f} мс, "
+                 f"максимальная {stats['max_delay'] * 1000:.0f} мс")
+        with self.render.lock:
+            self.batch_btn.disabled = False
+            self.render.mark(self.batch_btn)
+    
+    def host_point(self, index):
+        pc = self.pcs[self.hosts[index]]
+        return pc["x"] + 25, pc["y"] + 20
+    
+    def packet_sent(self, pid, source, destination, size, t, start, arrive):
+        self.packets.add(pid, source, destination, start, arrive)
+        src_x, src_y = self.host_point(source)
+        control = ft.Container(
+            content=ft.Text(f"#{pid}", size=8, color="black", weight=ft.FontWeight.BOLD),
             bgcolor="yellow",
             width=25,
             height=20,
             border_radius=10,
             alignment=ft.alignment.center,
-            left=src_data["x"] + 25,
-            top=src_data["y"] + 20
+            left=src_x,
+            top=src_y
         )
         
-        self.packets.append(packet)
-        self.network_area.controls.append(packet.control)
-        self.network_area.update()
+        self.network_area.controls.append(control)
+        self.render.mark(self.network_area)
         
-        self.log(f"Пакет #{packet.id}: {source} -> {destination}, Размер: {size} байт")
+        self.log(f"Пакет #{pid}: {self.hosts[source]} -> {self.hosts[destination]}, Размер: {size} байт", packet=pid)
+        self.update_stats()
+    
+    def packet_at_switch(self, pid, t, depart, delivery):
+        self.packets.to_downlink(pid, depart, delivery)
+        self.log(f"Пакет #{pid} достиг SWITCH", "DEBUG", pid)
+    
+    def remove_packet(self, pid):
+        # Метка удаляется так же, как строка массивов: на ее место встает
+        # последняя, без сдвига списка.
+        destination = self.hosts[self.packets.destination[self.packets.slot[pid]]]
+        i, moved = self.packets.remove(pid)
+        controls = self.network_area.controls
+        last = controls.pop()
+        if moved is not None:
+            controls[self.packet_base + i] = last
+        self.render.mark(self.network_area)
+        return destination
+    
+    def packet_delivered(self, pid, t, delay):
+        destination = self.remove_packet(pid)
+        self.log(f"Пакет #{pid} доставлен на {destination} (задержка: {delay * 1000:.0f} мс)", packet=pid)
+        self.update_stats()
+    
+    def packet_dropped(self, pid, t):
+        destination = self.remove_packet(pid)
+        self.log(f"Пакет #{pid} отброшен: очередь порта {destination} заполнена", "WARN", pid)
         self.update_stats()
     
     def update_packets(self):
-        packets_to_remove = []
-        
-        for packet in self.packets:
-            src_data = self.pcs[packet.source]
-            dst_data = self.pcs[packet.destination]
-            
-            src_x = src_data["x"] + 25
-            src_y = src_data["y"] + 20
-            dst_x = dst_data["x"] + 25
-            dst_y = dst_data["y"] + 20
-            
-            packet.progress += 0.1
-            
-            if not packet.at_switch:
-                packet.control.left = src_x + (self.switch_x - src_x) * packet.progress
-                packet.control.top = src_y + (self.switch_y - src_y) * packet.progress
-                
-                if packet.progress >= 1.0:
-                    packet.at_switch = True
-                    packet.progress = 0
-                    self.log(f"Пакет #{packet.id} достиг SWITCH")
-            else:
-                packet.control.left = self.switch_x + (dst_x - self.switch_x) * packet.progress
-                packet.control.top = self.switch_y + (dst_y - self.switch_y) * packet.progress
-                
-                if packet.progress >= 1.0:
-                    delay = (time.time() - packet.start_time) * 1000
-                    self.packets_delivered += 1
-                    self.total_delay += delay
-                    self.log(f"Пакет #{packet.id} доставлен на {packet.destination} (задержка: {delay:.0f} мс)")
-                    packets_to_remove.append(packet)
-                    self.update_stats()
-        
-        for packet in packets_to_remove:
-            self.packets.remove(packet)
-            if packet.control in self.network_area.controls:
-                self.network_area.controls.remove(packet.control)
+        # Хук кадра: положения всех пакетов в текущий момент модельного
+        # времени - один векторный шаг, затем перенос в метки.
+        n = self.packets.count
+        if n == 0:
+            return
+        self.packets.step(self.sim.now)
+        for control, (x, y) in zip(self.network_area.controls[self.packet_base:], self.packets.xy[:n].tolist()):
+            control.left = x
+            control.top = y
         
-        self.network_area.update()
+        self.render.mark(self.network_area)
     
     def update_stats(self):
-        self.stats_text.value = f"Пакетов отправлено: {self.packets_sent}\nПакетов доставлено: {self.packets_delivered}"
-        self.stats_text.update()
+        # Текст статистики собирается один раз за кадр, а не на каждый пакет.
+        self.stats_changed = True
+    
+    def refresh_stats(self):
+        if not self.stats_changed:
+            return
+        self.stats_changed = False
+        stats = self.sim.stats()
+        self.stats_text.value = (f"Пакетов отправлено: {stats['sent']}\nПакетов доставлено: {stats['delivered']}\n"
+                                 f"Отброшено: {stats['dropped']}, в пути: {stats['in_flight']}\n"
+                                 f"Средняя задержка: {stats['mean_delay'] * 1000:.0f} мс")
+        self.render.mark(self.stats_text)
+    
+    def report_render(self):
+        # Стоимость отрисовки по последним кадрам, раз в RENDER_REPORT_TIME.
+        now = time.perf_counter()
+        if now - self.render_report_at < RENDER_REPORT_TIME:
+            return
+        self.render_report_at = now
+        stats = self.render.stats()
+        text = (f"Отрисовка: {stats['fps']:.0f} кадров/с, кадр: ср. {stats['mean_ms']:.1f} мс, "
+                f"p95 {stats['p95_ms']:.1f} мс, макс. {stats['max_ms']:.1f} мс, опозданий {stats['late']}")
+        if text != self.render_text.value:
+            self.render_text.value = text
+            self.render.mark(self.render_text)
 
 def main(page: ft.Page):
     NetworkTerminal(page)
 
-ft.app(target=main)
+
+if __name__ == "__main__":
+    ft.app(target=main)
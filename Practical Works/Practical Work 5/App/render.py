@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+FRAME_HISTORY = 300
+
+
+class RenderScheduler:
+    # Отрисовка с фиксированной частотой кадров, независимой от модели.
+    # Код модели и наблюдатели только меняют свойства контролов и отмечают их
+    # через mark(); раз в кадр выполняются хуки кадра (например, пересчет
+    # положений пакетов) и все отмеченные контролы уходят клиенту одним
+    # page.update(...). Сколько бы раз контрол ни менялся между кадрами, он
+    # отправляется один раз.
+    # lock защищает контролы и набор отмеченных: поток модели меняет их под
+    # этой же блокировкой, хуки кадра и отправка тоже выполняются под ней -
+    # page.update() читает живые списки дочерних контролов (Stack, ListView),
+    # и добавленный во время отправки контрол не должен потеряться.
+    def __init__(self, page, fps=30):
+        self.page = page
+        self.fps = fps
+        self.lock = threading.RLock()
+        self.dirty = {}
+        self.hooks = []
+        self.running = False
+        self.frames = 0
+        self.late = 0
+        self.frame_times = deque(maxlen=FRAME_HISTORY)
+        self.frame_starts = deque(maxlen=FRAME_HISTORY)
+
+    def mark(self, *controls):
+        with self.lock:
+            for control in controls:
+                self.dirty[id(control)] = control
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def set_fps(self, fps):
+        if fps <= 0:
+            raise ValueError('Частота кадров должна быть больше 0')
+        self.fps = fps
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            threading.Thread(target=self.loop, daemon=True).start()
+
+    def stop(self):
+        self.running = False
+
+    def loop(self):
+        deadline = time.perf_counter()
+        while self.running:
+            self.flush()
+            deadline += 1 / self.fps
+            wait = deadline - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            else:
+                # Кадр не уложился в бюджет - следующий отсчитывается от
+                # текущего момента, пропущенные кадры не догоняются.
+                self.late += 1
+                deadline = time.perf_counter()
+
+    def flush(self):
+        start = time.perf_counter()
+        with self.lock:
+            for hook in self.hooks:
+                hook()
+            if not self.dirty:
+                return
+            controls = list(self.dirty.values())
+            self.dirty.clear()
+            self.page.update(*controls)
+        self.frames += 1
+        self.frame_starts.append(start)
+        self.frame_times.append(time.perf_counter() - start)
+
+    def stats(self):
+        # Время кадра (хуки + отправка) по последним FRAME_HISTORY кадрам.
+        if not self.frame_times:
+            return {'frames': 0, 'late': self.late, 'fps': 0.0, 'mean_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+        times = np.array(self.frame_times) * 1000
+        span = self.frame_starts[-1] - self.frame_starts[0]
+        return {
+            'frames': self.frames,
+            'late': self.late,
+            'fps': (len(self.frame_starts) - 1) / span if span > 0 else 0.0,
+            'mean_ms': float(times.mean()),
+            'p95_ms': float(np.percentile(times, 95)),
+            'max_ms': float(times.max()),
+        }